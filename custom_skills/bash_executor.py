@@ -0,0 +1,237 @@
+"""
+Bash command execution for the custom skills tool loop.
+
+run_command() runs a shell command with a wall-clock timeout and a hard cap
+on captured output:
+- the command runs in its own process group (session), and on timeout the
+  whole group is killed, including anything the command started; background
+  processes still holding the output pipes after the command exits are
+  killed as well, so no strays are left behind
+- stdout and stderr are read while the command runs; once a stream passes
+  the cap only its first and last bytes are kept, so memory stays bounded
+  however much the command prints
+- exit code, duration, timeout and truncation are returned with the output
+
+Example:
+    >>> result = run_command("git log --oneline", timeout=30)
+    >>> print(result["exit_code"], result["duration"], result["truncated"])
+    >>> print(format_result(result))
+"""
+
+import os
+import signal
+import subprocess
+import threading
+import time
+from typing import Optional, Dict, Any
+
+# Seconds a command may run before its process group is killed
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "120"))
+# Bytes of output kept per stream (head and tail halves)
+TOOL_OUTPUT_CAP_BYTES = int(os.getenv("TOOL_OUTPUT_CAP_BYTES", str(256 * 1024)))
+
+_READ_SIZE = 64 * 1024
+# Seconds, in total, to wait for pipes to close after the process exits or is killed
+_DRAIN_TIMEOUT = 5
+# Seconds between SIGTERM and SIGKILL when stopping a timed-out command
+_KILL_GRACE = 2
+_KILL_POLL_INTERVAL = 0.05
+
+
+class HeadTailBuffer:
+    """Keeps the first and last max_bytes / 2 bytes written to it."""
+
+    def __init__(self, max_bytes: int):
+        self.head_limit = max_bytes - max_bytes // 2
+        self.tail_limit = max_bytes // 2
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data and self.tail_limit:
+            self.tail += data
+            if len(self.tail) > self.tail_limit:
+                del self.tail[:len(self.tail) - self.tail_limit]
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.head) + len(self.tail)
+
+    def text(self) -> str:
+        head = self.head.decode("utf-8", "replace")
+        if not self.truncated:
+            return head + self.tail.decode("utf-8", "replace")
+        omitted = self.total - len(self.head) - len(self.tail)
+        return (
+            head
+            + f"\n[... {omitted} bytes omitted, {self.total} bytes in total ...]\n"
+            + self.tail.decode("utf-8", "replace")
+        )
+
+
+def _drain(stream, buffer: HeadTailBuffer) -> None:
+    try:
+        for chunk in iter(lambda: stream.read1(_READ_SIZE), b""):
+            buffer.write(chunk)
+    except (OSError, ValueError):
+        # Pipe closed underneath us after the process group was killed
+        pass
+
+
+def _join_readers(readers, timeout: float) -> bool:
+    """Wait for all reader threads up to one shared deadline; True if all ended."""
+    deadline = time.monotonic() + timeout
+    for reader in readers:
+        reader.join(max(0.0, deadline - time.monotonic()))
+    return not any(reader.is_alive() for reader in readers)
+
+
+def _kill_group(process: subprocess.Popen) -> None:
+    """Stop the command and every process in its group."""
+    if os.name == "nt":
+        # taskkill /T ends the whole process tree
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    # Wait for the whole group, not just the shell: when the shell has
+    # already exited, waiting on it alone would give the rest no grace
+    deadline = time.monotonic() + _KILL_GRACE
+    while time.monotonic() < deadline:
+        # Reap the shell, which otherwise stays in the group as a zombie
+        process.poll()
+        try:
+            os.killpg(process.pid, 0)
+        except ProcessLookupError:
+            return
+        time.sleep(_KILL_POLL_INTERVAL)
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def run_command(
+    command: str,
+    timeout: Optional[float] = TOOL_TIMEOUT,
+    max_output_bytes: int = TOOL_OUTPUT_CAP_BYTES,
+    cwd: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run a shell command with a timeout and bounded output capture.
+
+    Args:
+        command: Shell command to run
+        timeout: Seconds before the command's process group is killed (None: no limit)
+        max_output_bytes: Bytes kept per stream, split between head and tail
+        cwd: Working directory (default: the current directory)
+
+    Returns:
+        Dictionary with:
+        {
+            'stdout': str,
+            'stderr': str,
+            'exit_code': Optional[int],   # None if the command could not be waited for
+            'duration': float,            # seconds
+            'timed_out': bool,
+            'truncated': bool,            # True if either stream exceeded the cap
+            'stdout_bytes': int,          # total bytes written, including dropped ones
+            'stderr_bytes': int
+        }
+    """
+    started = time.perf_counter()
+    if os.name == "nt":
+        group_options = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group_options = {"start_new_session": True}
+
+    process = subprocess.Popen(
+        command,
+        shell=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        **group_options
+    )
+
+    stdout = HeadTailBuffer(max_output_bytes)
+    stderr = HeadTailBuffer(max_output_bytes)
+    readers = [
+        threading.Thread(target=_drain, args=(process.stdout, stdout), daemon=True),
+        threading.Thread(target=_drain, args=(process.stderr, stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = False
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        _kill_group(process)
+    except BaseException:
+        # e.g. KeyboardInterrupt: do not leave the command running
+        _kill_group(process)
+        raise
+    finally:
+        drained = _join_readers(readers, _DRAIN_TIMEOUT)
+
+    if not drained and not timed_out:
+        # The shell has exited but background processes it started still
+        # hold the pipes; stop them instead of leaving them running
+        _kill_group(process)
+        _join_readers(readers, _KILL_GRACE)
+    # Readers still running here belong to processes that left the group;
+    # they are daemon threads and end when those processes close the pipes
+
+    try:
+        exit_code = process.wait(timeout=_DRAIN_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        exit_code = None
+
+    return {
+        'stdout': stdout.text(),
+        'stderr': stderr.text(),
+        'exit_code': exit_code,
+        'duration': time.perf_counter() - started,
+        'timed_out': timed_out,
+        'truncated': stdout.truncated or stderr.truncated,
+        'stdout_bytes': stdout.total,
+        'stderr_bytes': stderr.total
+    }
+
+
+def format_result(result: Dict[str, Any], timeout: Optional[float] = None) -> str:
+    """
+    Render a run_command() result as tool output text.
+
+    Both streams are included, stderr after stdout, followed by a status
+    line with the exit code, duration, and any timeout or truncation.
+    """
+    parts = []
+    if result['stdout']:
+        parts.append(result['stdout'].rstrip("\n"))
+    if result['stderr']:
+        parts.append("[stderr]\n" + result['stderr'].rstrip("\n"))
+
+    status = f"[exit code {result['exit_code']}, {result['duration']:.2f}s"
+    if result['timed_out']:
+        limit = f" after {timeout:g}s" if timeout else ""
+        status += f", timed out{limit} and killed"
+    if result['truncated']:
+        status += (f", output truncated (stdout {result['stdout_bytes']} bytes, "
+                   f"stderr {result['stderr_bytes']} bytes in total)")
+    parts.append(status + "]")
+    return "\n".join(parts)
@@ -0,0 +1,168 @@
+"""
+Bounded conversation history for the custom skills tool loop.
+
+The tool loop re-sends the whole conversation on every request, so one
+large command output would otherwise be paid for on every later turn.
+ConversationHistory keeps the history within a byte budget:
+- each tool output is truncated to its head and tail with a size note
+- when the history exceeds the budget, older turns are compacted (their
+  tool outputs and text shortened) and, if that is not enough, the oldest
+  turns are dropped, always keeping the first message and the most recent
+  turns intact
+
+Example:
+    >>> history = ConversationHistory({"role": "user", "content": prompt})
+    >>> message = client.messages.create(..., messages=history.messages)
+    >>> history.add_turn(message.content, tool_results)
+"""
+
+import json
+import os
+from typing import List, Dict, Any
+
+# Budget for the whole history (~4 bytes per token)
+HISTORY_MAX_BYTES = int(os.getenv("HISTORY_MAX_BYTES", "100000"))
+# Largest single tool output kept in the history
+TOOL_OUTPUT_MAX_BYTES = int(os.getenv("TOOL_OUTPUT_MAX_BYTES", "10000"))
+# Most recent turns that are never compacted
+KEEP_RECENT_TURNS = 2
+# Size each text of an older turn is reduced to when compacting
+COMPACTED_BYTES = 300
+
+
+def truncate_middle(text: str, max_bytes: int) -> str:
+    """
+    Shorten text to about max_bytes, keeping its head and tail.
+
+    The omitted middle is replaced by a note with the original size.
+    Text within the limit is returned unchanged.
+    """
+    data = text.encode("utf-8")
+    if len(data) <= max_bytes:
+        return text
+    head = max_bytes * 2 // 3
+    tail = max_bytes - head
+    omitted = len(data) - head - tail
+    return (
+        data[:head].decode("utf-8", "ignore")
+        + f"\n\n[... {omitted} bytes omitted, {len(data)} bytes in total ...]\n\n"
+        + data[-tail:].decode("utf-8", "ignore")
+    )
+
+
+def _block_size(block) -> int:
+    if isinstance(block, str):
+        return len(block.encode("utf-8"))
+    if not isinstance(block, dict):
+        block = block.to_dict()
+    return len(json.dumps(block, default=str).encode("utf-8"))
+
+
+def _content_size(content) -> int:
+    if isinstance(content, list):
+        return sum(_block_size(block) for block in content)
+    return _block_size(content)
+
+
+def _shorten_tool_results(tool_results: List[Dict[str, Any]], max_bytes: int) -> List[Dict[str, Any]]:
+    shortened = []
+    for result in tool_results:
+        if isinstance(result.get("content"), str):
+            result = dict(result, content=truncate_middle(result["content"], max_bytes))
+        shortened.append(result)
+    return shortened
+
+
+def _shorten_assistant_content(content: list, max_bytes: int) -> list:
+    # tool_use blocks must stay, they pair with the tool results that follow
+    shortened = []
+    for block in content:
+        block_type = block["type"] if isinstance(block, dict) else block.type
+        if block_type == "text":
+            text = block["text"] if isinstance(block, dict) else block.text
+            block = {"type": "text", "text": truncate_middle(text, max_bytes)}
+        shortened.append(block)
+    return shortened
+
+
+class ConversationHistory:
+    """
+    Message history for the tool loop, kept within a byte budget.
+
+    Args:
+        first_message: The opening user message; it is never changed
+            (other than a note about dropped turns) so its prompt cache
+            prefix stays valid
+        max_bytes: Budget for the serialized history
+        max_tool_output_bytes: Largest tool output kept, head and tail
+        keep_recent_turns: Number of latest turns never compacted
+    """
+
+    def __init__(
+        self,
+        first_message: Dict[str, Any],
+        max_bytes: int = HISTORY_MAX_BYTES,
+        max_tool_output_bytes: int = TOOL_OUTPUT_MAX_BYTES,
+        keep_recent_turns: int = KEEP_RECENT_TURNS
+    ):
+        self.first_message = first_message
+        self.max_bytes = max_bytes
+        self.max_tool_output_bytes = max_tool_output_bytes
+        self.keep_recent_turns = keep_recent_turns
+        self.compacted_turns = 0
+        self.dropped_turns = 0
+        # Each turn is [assistant message, user message with tool results]
+        self._turns: List[List[Dict[str, Any]]] = []
+        self._compacted = 0
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        """The messages to send with the next request."""
+        first = self.first_message
+        if self.dropped_turns:
+            content = first["content"]
+            if isinstance(content, str):
+                content = [{"type": "text", "text": content}]
+            note = {
+                "type": "text",
+                "text": f"(The {self.dropped_turns} earliest tool call turn(s) were removed from "
+                        "this conversation to save context.)"
+            }
+            first = dict(first, content=list(content) + [note])
+        return [first] + [message for turn in self._turns for message in turn]
+
+    def size(self) -> int:
+        """Serialized size of the history in bytes."""
+        return sum(_content_size(message["content"]) for message in self.messages)
+
+    def add_turn(self, assistant_content, tool_results: List[Dict[str, Any]]) -> None:
+        """
+        Append an assistant message and the results of its tool calls.
+
+        Tool outputs are truncated to max_tool_output_bytes, then older turns
+        are compacted or dropped until the history fits max_bytes.
+        """
+        self._turns.append([
+            {"role": "assistant", "content": assistant_content},
+            {"role": "user", "content": _shorten_tool_results(tool_results, self.max_tool_output_bytes)},
+        ])
+        self._enforce_budget()
+
+    def _enforce_budget(self) -> None:
+        if self.size() <= self.max_bytes:
+            return
+
+        older = len(self._turns) - self.keep_recent_turns
+        # Compact older turns that are still full size, oldest first
+        while self._compacted < older and self.size() > self.max_bytes:
+            assistant, results = self._turns[self._compacted]
+            assistant["content"] = _shorten_assistant_content(list(assistant["content"]), COMPACTED_BYTES)
+            results["content"] = _shorten_tool_results(results["content"], COMPACTED_BYTES)
+            self._compacted += 1
+            self.compacted_turns += 1
+
+        # Still too large: drop the oldest turns
+        while len(self._turns) > self.keep_recent_turns and self.size() > self.max_bytes:
+            self._turns.pop(0)
+            self._compacted = max(0, self._compacted - 1)
+            self.dropped_turns += 1
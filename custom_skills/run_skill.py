@@ -2,8 +2,13 @@ import anthropic
 import os
 import argparse
 import sys
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from bash_executor import TOOL_TIMEOUT, format_result, run_command
+from conversation_history import ConversationHistory
+from skill_registry import SkillRegistry
+from skill_retrieval import SkillRetriever
+from shared import get_http_client
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,6 +18,13 @@ ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 ANTHROPIC_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929")
 SKILLS_STORAGE_PATH = os.getenv("SKILLS_STORAGE_PATH", "./skills")
 
+# Number of best-matching skills whose full instructions go into the prompt;
+# the others are listed with a one-line summary
+SKILLS_TOP_K = int(os.getenv("SKILLS_TOP_K", "3"))
+
+# Maximum bash tool calls from one response that run at the same time
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "4"))
+
 # Validate API key before initializing client
 if not ANTHROPIC_API_KEY:
     print("Error: The ANTHROPIC_API_KEY environment variable is not set.", file=sys.stderr)
@@ -20,7 +32,9 @@ if not ANTHROPIC_API_KEY:
     sys.exit(1)
 
 try:
-    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+    # One pooled, keep-alive transport reused by every request in the tool
+    # loop, configured in introduction/anthropic_client_init.py
+    client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, http_client=get_http_client())
 except anthropic.APIStatusError as e:
     print("--- Anthropic API Error ---", file=sys.stderr)
     print(f"Error initializing Anthropic client: {e.message}", file=sys.stderr)
@@ -31,47 +45,128 @@ except Exception as e:
     sys.exit(1)
 
 
-def load_all_skills(skills_base_dir: str = None) -> dict:
+def load_all_skills(skills_base_dir: str = None) -> SkillRegistry:
     """
     Loads all available custom skills from the skills directory.
     
+    Only each skill's frontmatter is read up front (and cached in an index
+    keyed by file modification time); the full instructions are read when
+    a skill is looked up.
+    
     Args:
         skills_base_dir (str): The base directory where all skill folders are stored.
         
     Returns:
-        dict: A dictionary mapping skill names to their full instructions.
+        SkillRegistry: A mapping of skill names to their full instructions.
     """
     if skills_base_dir is None:
         skills_base_dir = SKILLS_STORAGE_PATH
     
-    skills = {}
-    skills_path = Path(skills_base_dir)
+    return SkillRegistry(skills_base_dir)
+
+
+def select_skills(available_skills: SkillRegistry, user_prompt: str, top_k: int = SKILLS_TOP_K) -> tuple:
+    """
+    Ranks the skills for a prompt and builds the skills section of the prompt.
+    
+    The top_k best-matching skills are included with their full instructions;
+    every other skill gets a one-line stub with its description and the path
+    of its SKILL.md, which Claude can read with the bash tool if needed.
+    
+    Args:
+        available_skills (SkillRegistry): The loaded skills.
+        user_prompt (str): The user's prompt/request.
+        top_k (int): Number of skills included in full.
+        
+    Returns:
+        tuple: (skills_section, ranking as a list of (name, score), names included in full)
+    """
+    ranking = SkillRetriever(available_skills).search(user_prompt)
+    if len(ranking) <= top_k:
+        full = [name for name, _ in ranking]
+    else:
+        full = [name for name, score in ranking[:top_k] if score > 0]
     
-    if not skills_path.exists():
-        print(f"Error: Skills directory not found at '{skills_path}'", file=sys.stderr)
-        return skills
+    sections = [f"=== SKILL: {name} ===\n{available_skills[name]}" for name in full]
+    stubs = [
+        f"- {name}: {available_skills.description(name)} "
+        f"(instructions: {available_skills.skills_dir / name / 'SKILL.md'})"
+        for name, _ in ranking if name not in full
+    ]
+    if stubs:
+        sections.append("=== OTHER SKILLS (read the instructions file before using one) ===\n" + "\n".join(stubs))
     
-    for skill_dir in skills_path.iterdir():
-        if skill_dir.is_dir():
-            skill_md_path = skill_dir / "SKILL.md"
-            if skill_md_path.is_file():
-                try:
-                    with open(skill_md_path, "r", encoding="utf-8") as f:
-                        skills[skill_dir.name] = f.read()
-                except IOError as e:
-                    print(f"Warning: Could not read skill '{skill_dir.name}': {e}", file=sys.stderr)
+    return "\n\n".join(sections), ranking, full
+
+
+def print_retrieval_report(available_skills: SkillRegistry, ranking: list, full: list, skills_section: str) -> None:
+    """
+    Prints the skill ranking and the estimated prompt size saved by retrieval.
+    """
+    print("Skill retrieval:")
+    for rank, (name, score) in enumerate(ranking[:max(len(full), 5)], 1):
+        print(f"   {rank}. {name} (score {score:.2f}){' [full]' if name in full else ''}")
+    if len(ranking) > 5:
+        print(f"   ... {len(ranking) - 5} more")
     
-    return skills
+    # Estimate tokens at ~4 bytes each; the index already holds every file size
+    all_bytes = sum(available_skills.metadata(name)["size"] for name in available_skills)
+    prompt_bytes = len(skills_section.encode("utf-8"))
+    saved = 100 * (1 - prompt_bytes / all_bytes) if all_bytes else 0
+    print(f"   Skills prompt: ~{prompt_bytes // 4} tokens instead of ~{all_bytes // 4} with every skill in full ({saved:.0f}% smaller)")
 
 
-def run_all_skills(user_prompt: str, skills_base_dir: str = None) -> None:
+def skills_in_command(command: str, available_skills: SkillRegistry, full: list) -> set:
+    """
+    Returns the skills a bash command appears to use: any skill whose name is
+    in the command, or a skill from the prompt whose script it runs.
+    """
+    used = {name for name in available_skills if name in command}
+    for name in full:
+        if any(os.path.basename(script) in command for script in available_skills.scripts(name)):
+            used.add(name)
+    return used
+
+
+def execute_tool(tool_use) -> tuple:
+    """
+    Executes one tool_use block.
+    
+    Errors are caught and returned as an error tool_result, so one failing
+    call does not affect the others in the same turn.
+    
+    Returns:
+        tuple: (tool_result dict, output text to print)
+    """
+    if tool_use.name != "bash":
+        error_msg = f"Unknown tool: {tool_use.name}"
+        return {"type": "tool_result", "tool_use_id": tool_use.id, "content": error_msg, "is_error": True}, error_msg
+    
+    try:
+        # Execute the bash command with a timeout and capped output capture
+        result = run_command(tool_use.input["command"], timeout=TOOL_TIMEOUT, cwd=os.getcwd())
+        output = format_result(result, TOOL_TIMEOUT)
+        tool_result = {"type": "tool_result", "tool_use_id": tool_use.id, "content": output}
+        if result["exit_code"] != 0 or result["timed_out"]:
+            tool_result["is_error"] = True
+        return tool_result, output
+    except Exception as e:
+        error_msg = f"Error executing command: {str(e)}"
+        return {"type": "tool_result", "tool_use_id": tool_use.id, "content": error_msg, "is_error": True}, error_msg
+
+
+def run_all_skills(user_prompt: str, skills_base_dir: str = None, top_k: int = SKILLS_TOP_K) -> None:
     """
     Loads all available custom skills and lets Claude automatically select
     which one(s) to use based on the user's prompt.
     
+    Only the top_k skills that best match the prompt are sent with their
+    full instructions; the rest are listed with a one-line summary.
+    
     Args:
         user_prompt (str): The user's prompt/request.
         skills_base_dir (str): The base directory where all skill folders are stored.
+        top_k (int): Number of best-matching skills included in full.
     """
     if skills_base_dir is None:
         skills_base_dir = SKILLS_STORAGE_PATH
@@ -83,18 +178,18 @@ def run_all_skills(user_prompt: str, skills_base_dir: str = None) -> None:
         print("Error: No skills found in the skills directory.", file=sys.stderr)
         return
     
-    # Build the combined prompt with all skills
-    skills_section = "\n\n".join([
-        f"=== SKILL: {skill_name} ===\n{instructions}"
-        for skill_name, instructions in available_skills.items()
-    ])
+    # Build the skills part of the prompt from the best-matching skills
+    skills_section, ranking, full_skills = select_skills(available_skills, user_prompt, top_k)
     
-    combined_prompt = f"""You have access to the following custom skills. Based on the user's request, automatically select and use the most appropriate skill(s).
+    # The skills text depends on the ranking for this prompt, so it is only
+    # stable within one run; it goes first and ends in a prompt-cache
+    # breakpoint so each pass of the tool loop reads it from the cache.
+    skills_prompt = f"""You have access to the following custom skills. Based on the user's request, automatically select and use the most appropriate skill(s).
 
 {skills_section}
 
----
-User Request: "{user_prompt}"
+---"""
+    request_prompt = f"""User Request: "{user_prompt}"
 
 Based on the user's request above, identify which skill is most appropriate and follow its instructions to complete the task."""
 
@@ -102,18 +197,36 @@ Based on the user's request above, identify which skill is most appropriate and
         print(f"\n{'=' * 80}")
         print("CUSTOM CLAUDE SKILLS - INTELLIGENT SKILL SELECTION")
         print('=' * 80)
-        print(f"\nAvailable skills: {', '.join(available_skills.keys())}")
+        print(f"\nAvailable skills: {len(available_skills)}")
+        print_retrieval_report(available_skills, ranking, full_skills, skills_section)
         print("\nProcessing your request...")
         print("   Claude will automatically select the appropriate skill(s)")
         print('=' * 80 + "\n")
         
-        # Initialize conversation history
-        messages = [
+        # Initialize conversation history; it truncates large tool outputs
+        # and compacts older turns so each request stays within a budget
+        history = ConversationHistory(
             {
                 "role": "user",
-                "content": combined_prompt
+                "content": [
+                    {
+                        "type": "text",
+                        "text": skills_prompt,
+                        "cache_control": {"type": "ephemeral"}
+                    },
+                    {
+                        "type": "text",
+                        "text": request_prompt
+                    }
+                ]
             }
-        ]
+        )
+        
+        # Token totals over every request of the tool loop
+        totals = {"requests": 0, "input": 0, "output": 0, "cache_write": 0, "cache_read": 0}
+        
+        # Skills the tool calls used, to check the retrieval ranking afterwards
+        used_skills = set()
         
         # Tool execution loop
         while True:
@@ -121,9 +234,15 @@ Based on the user's request above, identify which skill is most appropriate and
                 model=ANTHROPIC_MODEL,
                 max_tokens=4096,
                 tools=[{"type": "bash_20250124", "name": "bash"}],
-                messages=messages
+                messages=history.messages
             )
             
+            totals["requests"] += 1
+            totals["input"] += message.usage.input_tokens
+            totals["output"] += message.usage.output_tokens
+            totals["cache_write"] += message.usage.cache_creation_input_tokens or 0
+            totals["cache_read"] += message.usage.cache_read_input_tokens or 0
+            
             # Check if we need to execute tools
             tool_uses = [block for block in message.content if block.type == "tool_use"]
             
@@ -138,57 +257,47 @@ Based on the user's request above, identify which skill is most appropriate and
                 print(f"\n\nToken Usage:")
                 print(f"   Input: {message.usage.input_tokens}")
                 print(f"   Output: {message.usage.output_tokens}")
+                print(f"   Cache write: {message.usage.cache_creation_input_tokens or 0}")
+                print(f"   Cache read: {message.usage.cache_read_input_tokens or 0}")
+                if totals["requests"] > 1:
+                    print(f"   All {totals['requests']} requests: {totals['input']} input, "
+                          f"{totals['output']} output, {totals['cache_write']} cache write, "
+                          f"{totals['cache_read']} cache read")
+                
+                if used_skills:
+                    ranks = {name: rank for rank, (name, _) in enumerate(ranking, 1)}
+                    for name in sorted(used_skills, key=ranks.get):
+                        placement = "in full prompt" if name in full_skills else "NOT in full prompt"
+                        print(f"\nRetrieval check: used {name} (rank {ranks[name]}, {placement})")
                 print("\n" + '=' * 80)
                 print("Process complete!")
                 print('=' * 80 + "\n")
                 break
             
-            # Execute tools and collect results
-            tool_results = []
+            # Execute tools and collect results. Independent calls run
+            # concurrently; results keep the order of the tool_use blocks.
             for tool_use in tool_uses:
                 if tool_use.name == "bash":
                     print(f"\n🔧 Executing: {tool_use.input['command']}")
-                    print("-" * 80)
-                    
-                    import subprocess
-                    try:
-                        # Execute the bash command
-                        result = subprocess.run(
-                            tool_use.input["command"],
-                            shell=True,
-                            capture_output=True,
-                            text=True,
-                            cwd=os.getcwd()
-                        )
-                        output = result.stdout if result.returncode == 0 else result.stderr
-                        print(output)
-                        print("-" * 80)
-                        
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": tool_use.id,
-                            "content": output
-                        })
-                    except Exception as e:
-                        error_msg = f"Error executing command: {str(e)}"
-                        print(error_msg)
-                        print("-" * 80)
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": tool_use.id,
-                            "content": error_msg,
-                            "is_error": True
-                        })
+                    used_skills |= skills_in_command(tool_use.input["command"], available_skills, full_skills)
+            print("-" * 80)
+            
+            if len(tool_uses) == 1:
+                outcomes = [execute_tool(tool_uses[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=min(TOOL_MAX_WORKERS, len(tool_uses))) as executor:
+                    outcomes = list(executor.map(execute_tool, tool_uses))
+            
+            tool_results = []
+            for tool_result, output in outcomes:
+                print(output)
+                print("-" * 80)
+                tool_results.append(tool_result)
             
             # Add assistant's response and tool results to conversation
-            messages.append({
-                "role": "assistant",
-                "content": message.content
-            })
-            messages.append({
-                "role": "user",
-                "content": tool_results
-            })
+            history.add_turn(message.content, tool_results)
+            print(f"   Turn {totals['requests']}: {message.usage.input_tokens} input tokens, "
+                  f"history {history.size() / 1024:.1f} KB")
 
     except anthropic.APIStatusError as e:
         print("\n--- Anthropic API Error ---", file=sys.stderr)
@@ -209,9 +318,15 @@ def main():
         "prompt",
         help="Your request/prompt (e.g., 'Summarize the repo at C:\\Code\\my-project')."
     )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=SKILLS_TOP_K,
+        help="Number of best-matching skills sent with their full instructions (default: %(default)s)."
+    )
     args = parser.parse_args()
 
-    run_all_skills(args.prompt)
+    run_all_skills(args.prompt, top_k=args.top_k)
 
 
 if __name__ == "__main__":
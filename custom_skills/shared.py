@@ -0,0 +1,32 @@
+"""
+Helpers shared with the introduction/ scripts.
+
+custom_skills is run as scripts from its own directory, so this module is
+the one place that puts the sibling introduction/ directory on the import
+path. The custom skills runner therefore needs introduction/ next to it;
+it uses no packages beyond introduction/requirements.txt.
+
+- get_http_client(): the pooled HTTP transport from anthropic_client_init
+- load_json(), save_json(): JSON file reads and atomic writes (json_files)
+"""
+
+import os
+import sys
+
+INTRODUCTION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "introduction")
+if INTRODUCTION_DIR not in sys.path:
+    # Appended, so modules in custom_skills/ take precedence
+    sys.path.append(INTRODUCTION_DIR)
+
+from json_files import load_json, save_json  # noqa: E402
+
+
+def get_http_client():
+    """
+    Return the process-wide pooled HTTP transport (see anthropic_client_init).
+
+    Imported on first use rather than at import time, so the caller's own
+    .env file is loaded before anthropic_client_init loads introduction's.
+    """
+    from anthropic_client_init import get_http_client as shared_http_client
+    return shared_http_client()
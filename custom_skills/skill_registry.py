@@ -0,0 +1,184 @@
+"""
+Indexed, lazily loaded registry of custom skills.
+
+Only the YAML frontmatter of each SKILL.md (name and description) is needed
+to decide which skills are relevant, so that is all the registry reads up
+front. Parsed frontmatter is kept in a JSON index keyed by each file's
+modification time and size; on later runs unchanged skills cost a single
+stat() call. Skill bodies and scripts/ listings are read only when asked
+for.
+
+Example:
+    >>> registry = SkillRegistry("./skills")
+    >>> for name in registry:
+    ...     print(name, registry.description(name))
+    >>> instructions = registry["git-analyzer"]   # SKILL.md read here
+"""
+
+import json
+import os
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterator
+
+from shared import load_json, save_json
+
+SKILL_INDEX_PATH = os.getenv("SKILL_INDEX_PATH", ".cache/skill_index.json")
+INDEX_VERSION = 1
+
+# Frontmatter is expected within the first lines; stop reading after this
+_MAX_FRONTMATTER_LINES = 200
+
+
+def parse_frontmatter(path: str) -> Dict[str, str]:
+    """
+    Read only the frontmatter block of a SKILL.md file.
+
+    Reading stops at the closing "---" line, so the skill body is never
+    loaded. Simple "key: value" lines are supported, which is all SKILL.md
+    frontmatter uses.
+
+    Returns:
+        Dict of frontmatter keys to string values (empty if there is none)
+    """
+    fields = {}
+    with open(path, "r", encoding="utf-8") as f:
+        if f.readline().strip() != "---":
+            return fields
+        for _ in range(_MAX_FRONTMATTER_LINES):
+            line = f.readline()
+            if not line or line.strip() == "---":
+                break
+            key, sep, value = line.partition(":")
+            if sep and key.strip() and not key.startswith((" ", "\t", "#")):
+                value = value.strip()
+                if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+                    value = value[1:-1]
+                fields[key.strip()] = value
+    return fields
+
+
+class SkillRegistry(Mapping):
+    """
+    Mapping of skill name to SKILL.md text, loaded on first access.
+
+    Iterating, len() and the metadata accessors only use the index; looking
+    up a skill's instructions reads its SKILL.md.
+
+    Args:
+        skills_dir: Directory containing one folder per skill
+        index_path: JSON file for the frontmatter index (None keeps it in memory)
+    """
+
+    def __init__(self, skills_dir: str, index_path: Optional[str] = SKILL_INDEX_PATH):
+        self.skills_dir = Path(skills_dir)
+        self.index_path = index_path
+        self.parsed = 0
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._bodies: Dict[str, str] = {}
+        self.refresh()
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if not self.index_path:
+            return {}
+        data = load_json(self.index_path, "skill index", stream=sys.stderr)
+        if data is None:
+            return {}
+        # The index may be shared between skill directories
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        return data.get("dirs", {}).get(str(self.skills_dir.resolve()), {})
+
+    def _save_index(self) -> None:
+        if not self.index_path:
+            return
+        data = {"version": INDEX_VERSION, "dirs": {}}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                existing = json.load(f)
+            if existing.get("version") == INDEX_VERSION:
+                data = existing
+        except (OSError, ValueError):
+            pass
+        data["dirs"][str(self.skills_dir.resolve())] = self._entries
+        save_json(self.index_path, data, indent=2)
+
+    def refresh(self) -> None:
+        """Re-scan the skills directory, parsing only new or changed SKILL.md files."""
+        if not self.skills_dir.exists():
+            print(f"Error: Skills directory not found at '{self.skills_dir}'", file=sys.stderr)
+            self._entries = {}
+            return
+
+        cached = self._load_index()
+        entries = {}
+        with os.scandir(self.skills_dir) as it:
+            for skill_dir in it:
+                if not skill_dir.is_dir():
+                    continue
+                skill_md_path = os.path.join(skill_dir.path, "SKILL.md")
+                try:
+                    stat = os.stat(skill_md_path)
+                except OSError:
+                    continue
+
+                entry = cached.get(skill_dir.name)
+                if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                    entries[skill_dir.name] = entry
+                    continue
+
+                try:
+                    frontmatter = parse_frontmatter(skill_md_path)
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"Warning: Could not read skill '{skill_dir.name}': {e}", file=sys.stderr)
+                    continue
+                self.parsed += 1
+                entries[skill_dir.name] = {
+                    "name": frontmatter.get("name", skill_dir.name),
+                    "description": frontmatter.get("description", ""),
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                }
+
+        changed = entries != cached
+        self._entries = dict(sorted(entries.items()))
+        self._bodies = {name: body for name, body in self._bodies.items() if name in entries}
+        if changed:
+            try:
+                self._save_index()
+            except OSError as e:
+                print(f"Warning: Could not save skill index: {e}", file=sys.stderr)
+
+    def __getitem__(self, name: str) -> str:
+        """Return the full SKILL.md text of a skill, reading it on first use."""
+        if name not in self._entries:
+            raise KeyError(name)
+        if name not in self._bodies:
+            with open(self.skills_dir / name / "SKILL.md", "r", encoding="utf-8") as f:
+                self._bodies[name] = f.read()
+        return self._bodies[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def metadata(self, name: str) -> Dict[str, Any]:
+        """Return the indexed frontmatter fields of a skill without reading its body."""
+        return self._entries[name]
+
+    def description(self, name: str) -> str:
+        return self._entries[name]["description"]
+
+    def scripts(self, name: str) -> List[str]:
+        """List the files in a skill's scripts/ directory (relative paths)."""
+        scripts_dir = self.skills_dir / name / "scripts"
+        if not scripts_dir.is_dir():
+            return []
+        return sorted(
+            str(path.relative_to(scripts_dir))
+            for path in scripts_dir.rglob("*")
+            if path.is_file() and "__pycache__" not in path.parts
+        )
@@ -0,0 +1,171 @@
+"""
+Local BM25 retrieval over custom skills.
+
+Each skill is indexed by its name, its frontmatter description and the
+headings of its SKILL.md. Term counts are precomputed and stored on disk,
+keyed by the SKILL.md modification time and size like the registry index,
+so only new or changed skills are read again. Ranking a request is then a
+pure in-memory computation.
+
+Example:
+    >>> registry = SkillRegistry("./skills")
+    >>> retriever = SkillRetriever(registry)
+    >>> retriever.search("summarize recent commits in my repo", k=3)
+    [('git-analyzer', 4.21)]
+"""
+
+import math
+import os
+import re
+import sys
+from collections import Counter
+from typing import Optional, List, Dict, Any, Tuple
+
+from shared import load_json, save_json
+from skill_registry import SkillRegistry
+
+SKILL_SEARCH_INDEX_PATH = os.getenv("SKILL_SEARCH_INDEX_PATH", ".cache/skill_search_index.json")
+INDEX_VERSION = 1
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Skill names say the most about a skill, then the description, then headings
+NAME_WEIGHT = 3
+DESCRIPTION_WEIGHT = 2
+HEADING_WEIGHT = 1
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_HEADING = re.compile(r"^#{1,6}\s+(.+)$")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from has have how i in is it its me my "
+    "of on or our please show that the this to us use using what when which with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words without stopwords, with a trailing plural 's' removed."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _skill_terms(registry: SkillRegistry, name: str) -> Counter:
+    metadata = registry.metadata(name)
+    terms = Counter()
+    for token in tokenize(f"{name} {metadata['name']}".replace("-", " ")):
+        terms[token] += NAME_WEIGHT
+    for token in tokenize(metadata["description"]):
+        terms[token] += DESCRIPTION_WEIGHT
+    # Read line by line rather than through registry[name], which would keep
+    # every skill body in memory after an index rebuild
+    with open(registry.skills_dir / name / "SKILL.md", "r", encoding="utf-8") as f:
+        for line in f:
+            heading = _HEADING.match(line.rstrip("\n"))
+            if heading:
+                for token in tokenize(heading.group(1)):
+                    terms[token] += HEADING_WEIGHT
+    return terms
+
+
+class SkillRetriever:
+    """
+    BM25 ranking of the skills in a registry.
+
+    Args:
+        registry: SkillRegistry to rank
+        index_path: JSON file for the precomputed term index (None keeps it in memory)
+    """
+
+    def __init__(self, registry: SkillRegistry, index_path: Optional[str] = SKILL_SEARCH_INDEX_PATH):
+        self.registry = registry
+        self.index_path = index_path
+        self.indexed = 0
+        self._key = str(registry.skills_dir.resolve())
+        self._docs = self._build()
+
+        self._avg_length = (
+            sum(doc["length"] for doc in self._docs.values()) / len(self._docs) if self._docs else 0.0
+        )
+        document_frequency = Counter()
+        for doc in self._docs.values():
+            document_frequency.update(doc["terms"].keys())
+        total = len(self._docs)
+        self._idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def _load_index(self) -> Dict[str, Any]:
+        if not self.index_path:
+            return {"version": INDEX_VERSION, "dirs": {}}
+        data = load_json(self.index_path, "skill search index", stream=sys.stderr)
+        if data and data.get("version") == INDEX_VERSION:
+            return data
+        return {"version": INDEX_VERSION, "dirs": {}}
+
+    def _build(self) -> Dict[str, Dict[str, Any]]:
+        """Load the stored index and re-index only skills whose SKILL.md changed."""
+        data = self._load_index()
+        cached = data["dirs"].get(self._key, {})
+        docs = {}
+        for name in self.registry:
+            metadata = self.registry.metadata(name)
+            doc = cached.get(name)
+            if doc and doc["mtime_ns"] == metadata["mtime_ns"] and doc["size"] == metadata["size"]:
+                docs[name] = doc
+                continue
+            try:
+                terms = _skill_terms(self.registry, name)
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Warning: Could not index skill '{name}': {e}", file=sys.stderr)
+                continue
+            self.indexed += 1
+            docs[name] = {
+                "mtime_ns": metadata["mtime_ns"],
+                "size": metadata["size"],
+                "terms": dict(terms),
+                "length": sum(terms.values()),
+            }
+
+        if docs != cached and self.index_path:
+            data["dirs"][self._key] = docs
+            try:
+                save_json(self.index_path, data)
+            except OSError as e:
+                print(f"Warning: Could not save skill search index: {e}", file=sys.stderr)
+        return docs
+
+    def score(self, query: str) -> Dict[str, float]:
+        """Return the BM25 score of every indexed skill for a query."""
+        query_terms = set(tokenize(query))
+        scores = {}
+        for name, doc in self._docs.items():
+            length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc["length"] / (self._avg_length or 1))
+            total = 0.0
+            for term in query_terms:
+                tf = doc["terms"].get(term)
+                if tf:
+                    total += self._idf[term] * tf * (BM25_K1 + 1) / (tf + length_norm)
+            scores[name] = total
+        return scores
+
+    def search(self, query: str, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Rank skills for a query.
+
+        Args:
+            query: The user's request
+            k: Number of results (default: all skills)
+
+        Returns:
+            List of (skill name, score), best first; ties keep name order
+        """
+        ranked = sorted(self.score(query).items(), key=lambda item: (-item[1], item[0]))
+        return ranked if k is None else ranked[:k]
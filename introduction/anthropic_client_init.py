@@ -1,61 +1,171 @@
+"""
+Shared Anthropic client for the introduction scripts.
+
+Importing this module only loads the environment; the client is built on
+first use and no API calls are made. All clients in the process share one
+pooled HTTP transport (keep-alive, bounded pool, HTTP/2 when the optional
+h2 package is installed), configured with these environment variables:
+
+    ANTHROPIC_MAX_CONNECTIONS   Maximum open connections (default: 20)
+    ANTHROPIC_MAX_KEEPALIVE     Idle connections kept alive (default: 10)
+    ANTHROPIC_KEEPALIVE_EXPIRY  Seconds an idle connection is kept (default: 30)
+    ANTHROPIC_HTTP2             Set to 0 to disable HTTP/2 (default: 1)
+
+Beta features such as skills are enabled per request with ``betas=[...]``
+rather than with separate client objects. The connection test and the skill
+listing are explicit:
+
+    python anthropic_client_init.py --probe --list-skills
+
+Scripts keep using ``from anthropic_client_init import client`` (resolved
+lazily) or call get_client() directly.
+"""
+
+import argparse
+import importlib.util
 import os
-from anthropic import Anthropic
+import threading
+from anthropic import Anthropic, DefaultHttpxClient
 from dotenv import load_dotenv
 
+try:
+    # The HTTP library the SDK is built on: httpx2 in current releases
+    import httpx2 as httpx
+except ImportError:
+    import httpx
+
 # Load environment variables from parent directory
 load_dotenv()
 
 API_KEY = os.getenv("ANTHROPIC_API_KEY")
 MODEL = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929")
 
-if not API_KEY:
-    raise ValueError("ANTHROPIC_API_KEY not found.")
-
-client = Anthropic(api_key=API_KEY)
-
-# Simple test to verify API connection
-test_response = client.messages.create(
-    model=MODEL,
-    max_tokens=100,
-    messages=[
-        {
-            "role": "user",
-            "content": "Say 'Connection successful!' if you can read this.",
-        }
-    ],
-)
-
-print("API Test Response:")
-print(test_response.content[0].text)
-print(
-    f"\n✓ Token usage: {test_response.usage.input_tokens} in, {test_response.usage.output_tokens} out"
-)
-
-# List all available Anthropic skills
-# Note: Skills API requires the skills beta header
-client_with_skills_beta = Anthropic(
-    api_key=API_KEY, default_headers={"anthropic-beta": "skills-2025-10-02"}
-)
-
-skills_response = client_with_skills_beta.beta.skills.list(source="anthropic")
-
-print("Available Anthropic-Managed Skills:")
-print("=" * 80)
-
-for skill in skills_response.data:
-    print(f"\n📦 Skill ID: {skill.id}")
-    print(f"   Title: {skill.display_title}")
-    print(f"   Latest Version: {skill.latest_version}")
-    print(f"   Created: {skill.created_at}")
-
-    # Get version details
-    try:
-        version_info = client_with_skills_beta.beta.skills.versions.retrieve(
-            skill_id=skill.id, version=skill.latest_version
-        )
-        print(f"   Name: {version_info.name}")
-        print(f"   Description: {version_info.description}")
-    except Exception as e:
-        print(f"   (Unable to fetch version details: {e})")
-
-print(f"\n\n✓ Found {len(skills_response.data)} Anthropic-managed skills")
+# Beta flag required by the Skills API
+SKILLS_BETA = "skills-2025-10-02"
+
+# Connection pool settings for the shared HTTP transport
+MAX_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("ANTHROPIC_KEEPALIVE_EXPIRY", "30"))
+HTTP2 = os.getenv("ANTHROPIC_HTTP2", "1") != "0" and importlib.util.find_spec("h2") is not None
+
+_http_client = None
+_client = None
+_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Return the pooled HTTP transport shared by every client in this process.
+
+    Pass it as ``http_client=`` when creating additional Anthropic clients
+    so they reuse the same connections and TLS sessions.
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+                http2=HTTP2,
+            )
+        return _http_client
+
+
+def get_client() -> Anthropic:
+    """Return the shared Anthropic client, creating it on first use."""
+    global _client
+    if _client is None:
+        if not API_KEY:
+            raise ValueError("ANTHROPIC_API_KEY not found.")
+        http_client = get_http_client()
+        with _lock:
+            if _client is None:
+                _client = Anthropic(api_key=API_KEY, http_client=http_client)
+    return _client
+
+
+def __getattr__(name: str):
+    # Keep "from anthropic_client_init import client" working without
+    # building the client at import time
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def test_connection() -> None:
+    """Send a tiny request to verify the API key and model work."""
+    test_response = get_client().messages.create(
+        model=MODEL,
+        max_tokens=100,
+        messages=[
+            {
+                "role": "user",
+                "content": "Say 'Connection successful!' if you can read this.",
+            }
+        ],
+    )
+
+    print("API Test Response:")
+    print(test_response.content[0].text)
+    print(
+        f"\n✓ Token usage: {test_response.usage.input_tokens} in, {test_response.usage.output_tokens} out"
+    )
+
+
+def list_anthropic_skills(refresh: bool = False) -> None:
+    """
+    Print all Anthropic-managed skills with their latest version details.
+
+    Uses the cached SkillCatalog, so repeated listings within its TTL make
+    no API calls; pass refresh=True to re-read the listing.
+    """
+    # Imported here because skill_catalog imports this module
+    from skill_catalog import SkillCatalog
+
+    catalog = SkillCatalog(source="anthropic")
+    skills = catalog.list_skills(refresh=refresh)
+
+    print("Available Anthropic-Managed Skills:")
+    print("=" * 80)
+
+    for skill in skills:
+        print(f"\n📦 Skill ID: {skill['skill_id']}")
+        print(f"   Title: {skill['display_title']}")
+        print(f"   Latest Version: {skill['latest_version']}")
+        print(f"   Created: {skill['created_at']}")
+        if 'error' in skill:
+            print(f"   (Unable to fetch version details: {skill['error']})")
+        else:
+            print(f"   Name: {skill['name']}")
+            print(f"   Description: {skill['description']}")
+
+    print(f"\n\n✓ Found {len(skills)} Anthropic-managed skills ({catalog.api_calls} API calls)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the Anthropic API connection and list available skills."
+    )
+    parser.add_argument("--probe", action="store_true", help="Send a test message to verify the connection")
+    parser.add_argument("--list-skills", action="store_true", help="List Anthropic-managed skills")
+    parser.add_argument("--refresh", action="store_true", help="Ignore the cached skill catalog")
+    args = parser.parse_args()
+
+    # With no flags, run both checks (the module's original behaviour)
+    if not args.probe and not args.list_skills:
+        args.probe = args.list_skills = True
+
+    if args.probe:
+        test_connection()
+    if args.list_skills:
+        if args.probe:
+            print()
+        list_anthropic_skills(refresh=args.refresh)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 
 import os
+import sys
 from pathlib import Path
 from anthropic import Anthropic
 from anthropic_client_init import client
@@ -9,17 +10,22 @@ from file_utils import (
     get_file_info,
     print_download_summary,
 )
+from skill_stream import stream_skill_request
 
 # Get configuration from environment
 API_KEY = os.getenv("ANTHROPIC_API_KEY")
 MODEL = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929")
 
+# Pass --stream to print the response as it is generated and download
+# files as soon as they are created
+STREAM = "--stream" in sys.argv[1:]
+
 # Create outputs directory if it doesn't exist
 OUTPUT_DIR = Path.cwd().parent / "outputs"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 # Create a Word document report
-docx_response = client.beta.messages.create(
+docx_request = dict(
     model=MODEL,
     max_tokens=4096,
     container={
@@ -37,9 +43,17 @@ docx_response = client.beta.messages.create(
 
 print("Word Document Response:")
 print("=" * 80)
-for content in docx_response.content:
-    if content.type == "text":
-        print(content.text)
+if STREAM:
+    # Text is printed as it arrives; files download while Claude keeps working
+    docx_response, results = stream_skill_request(
+        client, output_dir=str(OUTPUT_DIR), prefix="report_", **docx_request
+    )
+else:
+    docx_response = client.beta.messages.create(**docx_request)
+    results = None
+    for content in docx_response.content:
+        if content.type == "text":
+            print(content.text)
 
 print("\n\n📊 Token Usage:")
 print(f"   Input: {docx_response.usage.input_tokens}")
@@ -51,9 +65,11 @@ file_ids = extract_file_ids(docx_response)
 if file_ids:
     print(f"\n✓ Found {len(file_ids)} file(s)\n")
 
-    results = download_all_files(
-        client, docx_response, output_dir=str(OUTPUT_DIR), prefix="report_"
-    )
+    # Files were already downloaded while streaming
+    if results is None:
+        results = download_all_files(
+            client, docx_response, output_dir=str(OUTPUT_DIR), prefix="report_"
+        )
 
     print_download_summary(results)
 
@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 from anthropic import Anthropic
 from anthropic_client_init import client
@@ -8,17 +9,22 @@ from file_utils import (
     get_file_info,
     print_download_summary,
 )
+from skill_stream import stream_skill_request
 
 # Get configuration from environment
 API_KEY = os.getenv("ANTHROPIC_API_KEY")
 MODEL = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929")
 
+# Pass --stream to print the response as it is generated and download
+# files as soon as they are created
+STREAM = "--stream" in sys.argv[1:]
+
 # Create outputs directory if it doesn't exist
 OUTPUT_DIR = Path.cwd().parent / "outputs"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 # Create a PDF receipt
-pdf_response = client.beta.messages.create(
+pdf_request = dict(
     model=MODEL,
     max_tokens=4096,
     container={
@@ -58,9 +64,17 @@ Use simple, clean formatting with clear sections.
 
 print("PDF Response:")
 print("=" * 80)
-for content in pdf_response.content:
-    if content.type == "text":
-        print(content.text)
+if STREAM:
+    # Text is printed as it arrives; files download while Claude keeps working
+    pdf_response, results = stream_skill_request(
+        client, output_dir=str(OUTPUT_DIR), prefix="receipt_", **pdf_request
+    )
+else:
+    pdf_response = client.beta.messages.create(**pdf_request)
+    results = None
+    for content in pdf_response.content:
+        if content.type == "text":
+            print(content.text)
 
 print("\n\n📊 Token Usage:")
 print(f"   Input: {pdf_response.usage.input_tokens}")
@@ -70,25 +84,20 @@ print(f"   Output: {pdf_response.usage.output_tokens}")
 file_ids = extract_file_ids(pdf_response)
 
 if file_ids:
-    results = download_all_files(
-        client, pdf_response, output_dir=str(OUTPUT_DIR), prefix="receipt_"
-    )
+    # Files were already downloaded while streaming
+    if results is None:
+        results = download_all_files(
+            client, pdf_response, output_dir=str(OUTPUT_DIR), prefix="receipt_"
+        )
 
     print_download_summary(results)
 
-    # Verify PDF integrity
+    # PDF integrity (header and trailer) was checked while downloading
     for result in results:
-        if result["success"]:
-            file_path = result["output_path"]
-            file_size = result["size"]
-
-            # Basic PDF validation
-            with open(file_path, "rb") as f:
-                header = f.read(5)
-                if header == b"%PDF-":
-                    print(f"\n✅ PDF file is valid: {file_path}")
-                    print(f"   File size: {file_size / 1024:.1f} KB")
-                else:
-                    print(f"\n⚠️ File may not be a valid PDF: {file_path}")
+        if result["success"] and result["validation"] == "valid":
+            print(f"\n✅ PDF file is valid: {result['output_path']}")
+            print(f"   File size: {result['size'] / 1024:.1f} KB")
+        elif result["validation"] == "invalid":
+            print(f"\n⚠️ File is not a valid PDF: {result['output_path']}")
 else:
-    print("❌ No files found in response")
\ No newline at end of file
+    print("❌ No files found in response")
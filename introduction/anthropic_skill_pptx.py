@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 from anthropic import Anthropic
 from anthropic_client_init import client
@@ -7,17 +8,22 @@ from file_utils import (
     extract_file_ids,
     print_download_summary,
 )
+from skill_stream import stream_skill_request
 
 # Get configuration from environment
 API_KEY = os.getenv("ANTHROPIC_API_KEY")
 MODEL = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929")
 
+# Pass --stream to print the response as it is generated and download
+# files as soon as they are created
+STREAM = "--stream" in sys.argv[1:]
+
 # Create outputs directory if it doesn't exist
 OUTPUT_DIR = Path.cwd().parent / "outputs"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 # Create a PowerPoint presentation
-pptx_response = client.beta.messages.create(
+pptx_request = dict(
     model=MODEL,
     max_tokens=4096,
     container={
@@ -49,9 +55,17 @@ Use clean, professional formatting.
 
 print("PowerPoint Response:")
 print("=" * 80)
-for content in pptx_response.content:
-    if content.type == "text":
-        print(content.text)
+if STREAM:
+    # Text is printed as it arrives; files download while Claude keeps working
+    pptx_response, results = stream_skill_request(
+        client, output_dir=str(OUTPUT_DIR), prefix="q3_review_", **pptx_request
+    )
+else:
+    pptx_response = client.beta.messages.create(**pptx_request)
+    results = None
+    for content in pptx_response.content:
+        if content.type == "text":
+            print(content.text)
 
 print("\n\n📊 Token Usage:")
 print(f"   Input: {pptx_response.usage.input_tokens}")
@@ -61,9 +75,11 @@ print(f"   Output: {pptx_response.usage.output_tokens}")
 file_ids = extract_file_ids(pptx_response)
 
 if file_ids:
-    results = download_all_files(
-        client, pptx_response, output_dir=str(OUTPUT_DIR), prefix="q3_review_"
-    )
+    # Files were already downloaded while streaming
+    if results is None:
+        results = download_all_files(
+            client, pptx_response, output_dir=str(OUTPUT_DIR), prefix="q3_review_"
+        )
 
     print_download_summary(results)
 
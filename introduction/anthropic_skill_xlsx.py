@@ -1,4 +1,5 @@
 import os
+import sys
 from pathlib import Path
 from anthropic import Anthropic
 from anthropic_client_init import client
@@ -8,11 +9,16 @@ from file_utils import (
     get_file_info,
     print_download_summary,
 )
+from skill_stream import stream_skill_request
 
 # Get configuration from environment
 API_KEY = os.getenv("ANTHROPIC_API_KEY")
 MODEL = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929")
 
+# Pass --stream to print the response as it is generated and download
+# files as soon as they are created
+STREAM = "--stream" in sys.argv[1:]
+
 # Create outputs directory if it doesn't exist
 OUTPUT_DIR = Path.cwd().parent / "outputs"
 OUTPUT_DIR.mkdir(exist_ok=True)
@@ -35,7 +41,7 @@ response = client.beta.messages.create(
 )
 
 # Create an Excel budget spreadsheet
-excel_response = client.beta.messages.create(  # Note: Using beta.messages for Skills support
+excel_request = dict(
     model=MODEL,
     max_tokens=4096,
     container={
@@ -75,13 +81,21 @@ Include:
 
 print("Excel Response:")
 print("=" * 80)
-for content in excel_response.content:
-    if content.type == "text":
-        print(content.text)
-    elif content.type == "tool_use":
-        print(f"\n🔧 Tool: {content.name}")
-        if hasattr(content, "input"):
-            print(f"   Input preview: {str(content.input)[:200]}...")
+if STREAM:
+    # Text is printed as it arrives; files download while Claude keeps working
+    excel_response, results = stream_skill_request(
+        client, output_dir=str(OUTPUT_DIR), prefix="budget_", **excel_request
+    )
+else:
+    excel_response = client.beta.messages.create(**excel_request)
+    results = None
+    for content in excel_response.content:
+        if content.type == "text":
+            print(content.text)
+        elif content.type == "tool_use":
+            print(f"\n🔧 Tool: {content.name}")
+            if hasattr(content, "input"):
+                print(f"   Input preview: {str(content.input)[:200]}...")
 
 print("\n\n📊 Token Usage:")
 print(f"   Input: {excel_response.usage.input_tokens}")
@@ -94,10 +108,11 @@ file_ids = extract_file_ids(excel_response)
 if file_ids:
     print(f"✓ Found {len(file_ids)} file(s)\n")
 
-    # Download all files
-    results = download_all_files(
-        client, excel_response, output_dir=str(OUTPUT_DIR), prefix="budget_"
-    )
+    # Files were already downloaded while streaming
+    if results is None:
+        results = download_all_files(
+            client, excel_response, output_dir=str(OUTPUT_DIR), prefix="budget_"
+        )
 
     # Print summary
     print_download_summary(results)
@@ -9,11 +9,22 @@ from file_utils import (
     get_file_info,
     print_download_summary,
 )
+from skill_router import route_skills
+from skill_session import SkillSession
+from skill_stream import stream_skill_request
 
 # Get configuration from environment
 API_KEY = os.getenv("ANTHROPIC_API_KEY")
 MODEL = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929")
 
+# Pass --stream to print the response as it is generated and download
+# files as soon as they are created
+STREAM = "--stream" in sys.argv[1:]
+
+# Pass --session to keep asking for follow-up requests that continue in the
+# same container
+SESSION = "--session" in sys.argv[1:]
+
 # Create outputs directory if it doesn't exist
 OUTPUT_DIR = Path.cwd().parent / "outputs"
 OUTPUT_DIR.mkdir(exist_ok=True)
@@ -40,69 +51,82 @@ print("🚀 Processing your request...")
 print("   Claude will automatically select the appropriate skill(s)")
 print("=" * 80)
 
-# Make the API call with ALL skills available
-# Claude will intelligently choose which skill(s) to use based on the user's prompt
-response = client.beta.messages.create(
-    model=MODEL,
-    max_tokens=4096,
-    container={
-        "skills": [
-            {"type": "anthropic", "skill_id": "xlsx", "version": "latest"},
-            {"type": "anthropic", "skill_id": "pptx", "version": "latest"},
-            {"type": "anthropic", "skill_id": "pdf", "version": "latest"},
-            {"type": "anthropic", "skill_id": "docx", "version": "latest"}
-        ]
-    },
-    tools=[{"type": "code_execution_20250825", "name": "code_execution"}],
-    messages=[
-        {
-            "role": "user",
-            "content": user_prompt
-        }
-    ],
-    betas=["code-execution-2025-08-25", "files-api-2025-04-14", "skills-2025-10-02"],
-)
+# Attach only the skill(s) the request clearly needs; when the router is
+# not confident, ALL skills are attached and Claude chooses. Sessions keep
+# all skills because follow-up requests may need another format.
+skills = None if SESSION else route_skills(user_prompt, client=client)['skills']
 
-print("\n🤖 Claude's Response:")
-print("=" * 80)
-for content in response.content:
-    if content.type == "text":
-        print(content.text)
-    elif content.type == "tool_use":
-        print(f"\n🔧 Tool Used: {content.name}")
-
-print("\n\n📊 Token Usage:")
-print(f"   Input: {response.usage.input_tokens}")
-print(f"   Output: {response.usage.output_tokens}")
-
-# Download generated file(s)
-file_ids = extract_file_ids(response)
-
-if file_ids:
-    print(f"\n✓ Found {len(file_ids)} file(s)\n")
-
-    # Download all files with blank prefix
-    results = download_all_files(
-        client, response, output_dir=str(OUTPUT_DIR), prefix=""
-    )
-
-    # Print summary
-    print_download_summary(results)
-
-    # Show file details
-    for file_id in file_ids:
-        info = get_file_info(client, file_id)
-        if info:
-            print(f"\n📄 File Details:")
-            print(f"   Filename: {info['filename']}")
-            print(f"   Size: {info['size'] / 1024:.1f} KB")
-            print(f"   Created: {info['created_at']}")
-            print(f"   Location: {OUTPUT_DIR}")
-else:
-    print("\n❌ No files found in response")
-    print("\nDebug: Response content types:")
-    for i, content in enumerate(response.content):
-        print(f"  {i}. {content.type}")
+# All turns run in one session. Follow-up requests (--session) reuse the
+# same code-execution container, so they skip the container start-up and
+# can refine the files created earlier. A single request has no follow-up
+# to send history to (or to read a cached prefix back), so history - and
+# its cache breakpoint - is kept only with --session.
+session = SkillSession(client, skills=skills, model=MODEL, keep_history=SESSION)
+
+while user_prompt:
+    request = session.request(user_prompt)
+
+    print("\n🤖 Claude's Response:")
+    print("=" * 80)
+    if STREAM:
+        # Text is printed as it arrives; files download while Claude keeps working
+        response, results = stream_skill_request(
+            client, output_dir=str(OUTPUT_DIR), prefix="", **request
+        )
+    else:
+        response = client.beta.messages.create(**request)
+        results = None
+        for content in response.content:
+            if content.type == "text":
+                print(content.text)
+            elif content.type == "tool_use":
+                print(f"\n🔧 Tool Used: {content.name}")
+    session.record(response)
+
+    print("\n\n📊 Token Usage:")
+    print(f"   Input: {response.usage.input_tokens}")
+    print(f"   Output: {response.usage.output_tokens}")
+    print(f"   Cache write: {response.usage.cache_creation_input_tokens or 0}")
+    print(f"   Cache read: {response.usage.cache_read_input_tokens or 0}")
+
+    # Download generated file(s)
+    file_ids = extract_file_ids(response)
+
+    if file_ids:
+        print(f"\n✓ Found {len(file_ids)} file(s)\n")
+
+        # Download all files with blank prefix (already done when streaming)
+        if results is None:
+            results = download_all_files(
+                client, response, output_dir=str(OUTPUT_DIR), prefix=""
+            )
+
+        # Print summary
+        print_download_summary(results)
+
+        # Show file details
+        for file_id in file_ids:
+            info = get_file_info(client, file_id)
+            if info:
+                print(f"\n📄 File Details:")
+                print(f"   Filename: {info['filename']}")
+                print(f"   Size: {info['size'] / 1024:.1f} KB")
+                print(f"   Created: {info['created_at']}")
+                print(f"   Location: {OUTPUT_DIR}")
+    else:
+        print("\n❌ No files found in response")
+        print("\nDebug: Response content types:")
+        for i, content in enumerate(response.content):
+            print(f"  {i}. {content.type}")
+
+    if not SESSION:
+        break
+
+    turn = session.turns[-1]
+    print(f"\n⏱️  Turn took {turn['elapsed']:.1f}s (container {turn['container_id']})")
+    user_prompt = input("\nEnter a follow-up request (press Enter to finish): ").strip()
+
+session.close()
 
 print("\n" + "=" * 80)
 print("✅ Process complete!")
@@ -0,0 +1,164 @@
+"""
+Generate the same content in several formats at once.
+
+Sends one skills request per target format concurrently and downloads each
+format's files as soon as its response arrives, so the total wall time is
+close to the slowest format rather than the sum of all of them.
+
+Usage:
+    python anthropic_skills_multi.py "Q3 sales summary for Acme Corp" --formats xlsx pdf pptx
+    python anthropic_skills_multi.py "Team onboarding guide" --formats docx pdf --prefix onboarding_
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any
+
+from anthropic import Anthropic
+
+from file_utils import download_all_files, print_download_summary
+from skill_request import ALL_SKILLS, build_skill_request
+
+FORMAT_NAMES = {
+    "xlsx": "an Excel workbook",
+    "pptx": "a PowerPoint presentation",
+    "pdf": "a PDF document",
+    "docx": "a Word document",
+}
+
+
+def _generate_format(
+    client: Anthropic,
+    prompt: str,
+    skill_id: str,
+    output_dir: str,
+    prefix: str,
+    started: float
+) -> Dict[str, Any]:
+    """Run one format's request and download its files."""
+    report = {
+        'format': skill_id,
+        'success': False,
+        'error': None,
+        'request_time': None,
+        'download_time': None,
+        'finished_after': None,
+        'results': []
+    }
+    request_started = time.perf_counter()
+    try:
+        response = client.beta.messages.create(**build_skill_request(
+            f"{prompt}\n\nCreate this as {FORMAT_NAMES[skill_id]} (.{skill_id}).", [skill_id]
+        ))
+        report['request_time'] = time.perf_counter() - request_started
+
+        download_started = time.perf_counter()
+        report['results'] = download_all_files(
+            client, response, output_dir=output_dir, prefix=f"{prefix}{skill_id}_"
+        )
+        report['download_time'] = time.perf_counter() - download_started
+
+        if not report['results']:
+            report['error'] = "No files found in response"
+        else:
+            failed = [r for r in report['results'] if not r['success']]
+            report['success'] = not failed
+            if failed:
+                report['error'] = f"{len(failed)} file download(s) failed"
+    except Exception as e:
+        report['error'] = str(e)
+
+    report['finished_after'] = time.perf_counter() - started
+    return report
+
+
+def generate_formats(
+    client: Anthropic,
+    prompt: str,
+    formats: List[str],
+    output_dir: str = "outputs",
+    prefix: str = ""
+) -> Dict[str, Any]:
+    """
+    Create the same content in several formats concurrently.
+
+    Args:
+        client: Anthropic client instance
+        prompt: Description of the content to create
+        formats: Target formats, any of xlsx, pptx, pdf and docx
+        output_dir: Directory where files should be saved
+        prefix: Optional prefix for filenames; each file also gets "<format>_"
+
+    Returns:
+        Dict with 'formats' (one report per format, in the order given, with
+        success, error, request_time, download_time, finished_after and the
+        download results) and 'wall_time' in seconds
+
+    Raises:
+        ValueError: If a format is not one of the document skills
+    """
+    unknown = [f for f in formats if f not in ALL_SKILLS]
+    if unknown:
+        raise ValueError(f"Unknown format(s): {', '.join(unknown)}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(formats))) as executor:
+        reports = list(executor.map(
+            lambda skill_id: _generate_format(client, prompt, skill_id, output_dir, prefix, started),
+            formats
+        ))
+    return {'formats': reports, 'wall_time': time.perf_counter() - started}
+
+
+def print_format_report(summary: Dict[str, Any]) -> None:
+    """Print per-format latency and how the wall time compares to running them one by one."""
+    reports = summary['formats']
+
+    print("\nPer-Format Latency")
+    print("=" * 50)
+    for report in reports:
+        status = "✓" if report['success'] else "✗"
+        request_time = f"{report['request_time']:.1f}s" if report['request_time'] is not None else "-"
+        download_time = f"{report['download_time']:.1f}s" if report['download_time'] is not None else "-"
+        print(f"{status} {report['format']:<5} request {request_time:>7}  download {download_time:>6}  "
+              f"done after {report['finished_after']:.1f}s")
+        if report['error']:
+            print(f"   Error: {report['error']}")
+
+    sequential = sum(
+        (report['request_time'] or 0) + (report['download_time'] or 0) for report in reports
+    )
+    print(f"\nWall time: {summary['wall_time']:.1f}s "
+          f"(slowest format {max(r['finished_after'] for r in reports):.1f}s, "
+          f"one after another ~{sequential:.1f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create the same content in several document formats at once.")
+    parser.add_argument("prompt", help="Description of the content to create")
+    parser.add_argument("--formats", nargs="+", choices=ALL_SKILLS, default=["xlsx", "pdf", "pptx"],
+                        help="Target formats (default: xlsx pdf pptx)")
+    parser.add_argument("--prefix", default="", help="Prefix for the downloaded filenames")
+    parser.add_argument("--output-dir", default=str(Path.cwd().parent / "outputs"), help="Where files are saved")
+    args = parser.parse_args()
+
+    from anthropic_client_init import client
+
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    print(f"🚀 Creating {', '.join(args.formats)} concurrently...")
+    summary = generate_formats(client, args.prompt, args.formats, args.output_dir, args.prefix)
+
+    results = [r for report in summary['formats'] for r in report['results']]
+    if results:
+        print_download_summary(results)
+    print_format_report(summary)
+
+    if not all(report['success'] for report in summary['formats']):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Content-addressed local store for files downloaded from the Files API.
+
+The store keeps two things under its root directory:
+- blobs/<sha256[:2]>/<sha256>: one copy of every distinct file content
+- manifest.json: file_id -> {path, filename, size, sha256, stored_at}
+
+Downloaded outputs are hard-linked to their blob, so identical content is
+kept on disk only once, and a file_id that is already in the manifest can be
+materialized again without touching the network.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+from json_files import load_json, save_json
+
+MANIFEST_NAME = "manifest.json"
+
+
+def sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the hex sha256 of a file, reading it in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    """
+    Atomically place source's content at destination.
+
+    Uses a hard link when possible and falls back to a copy (for example
+    across filesystems).
+    """
+    directory = os.path.dirname(destination) or "."
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory,
+        prefix=f".{os.path.basename(destination)}.",
+        suffix=".part"
+    )
+    os.close(fd)
+    os.remove(temp_path)
+    try:
+        try:
+            os.link(source, temp_path)
+        except OSError:
+            shutil.copyfile(source, temp_path)
+        os.replace(temp_path, destination)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ArtifactStore:
+    """
+    Manifest plus content-addressed blob store for downloaded artifacts.
+
+    Note that outputs are hard links to the stored blobs: modify a
+    materialized file in place and the blob changes with it, which
+    verify() will report.
+
+    Example:
+        >>> store = ArtifactStore("outputs/.store")
+        >>> results = download_all_files(client, response, store=store)
+        >>> # Later runs resolve the same file IDs without a download
+        >>> results = download_all_files(client, response, store=store)
+        >>> print(store.verify())
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        return load_json(self.manifest_path, "manifest") or {}
+
+    def _save_manifest(self) -> None:
+        # Caller holds self._lock
+        save_json(self.manifest_path, self._manifest, indent=2, sort_keys=True)
+
+    def blob_path(self, sha256: str) -> str:
+        """Return the path of the blob holding content with this digest."""
+        return os.path.join(self.blob_dir, sha256[:2], sha256)
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Return the manifest entry for file_id, or None if unknown."""
+        with self._lock:
+            entry = self._manifest.get(file_id)
+            return dict(entry) if entry else None
+
+    def materialize(self, file_id: str, output_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Place the stored content for file_id at output_path.
+
+        Returns the manifest entry on success, or None when file_id is not
+        in the store or its blob is missing or has the wrong size.
+        """
+        entry = self.get(file_id)
+        if entry is None:
+            return None
+
+        blob = self.blob_path(entry['sha256'])
+        try:
+            if os.path.getsize(blob) != entry['size']:
+                return None
+        except OSError:
+            return None
+
+        # Nothing to do when output_path is already a link to the blob
+        try:
+            if os.path.samefile(blob, output_path):
+                return entry
+        except OSError:
+            pass
+
+        _link_or_copy(blob, output_path)
+        return entry
+
+    def add(
+        self,
+        file_id: str,
+        path: str,
+        sha256: str,
+        size: int,
+        filename: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Record a freshly downloaded file in the store.
+
+        The content is hard-linked into the blob directory. If a blob with
+        the same digest already exists, path is replaced by a link to it so
+        that identical content is stored once. filename is the file's own
+        name, without any prefix added to path (default: path's basename).
+        """
+        blob = self.blob_path(sha256)
+        if os.path.exists(blob):
+            try:
+                if not os.path.samefile(blob, path):
+                    _link_or_copy(blob, path)
+            except OSError:
+                _link_or_copy(blob, path)
+        else:
+            _link_or_copy(path, blob)
+
+        entry = {
+            'path': path,
+            'filename': filename or os.path.basename(path),
+            'size': size,
+            'sha256': sha256,
+            'stored_at': time.time()
+        }
+        with self._lock:
+            self._manifest[file_id] = entry
+            self._save_manifest()
+        return dict(entry)
+
+    def verify(self) -> List[Dict[str, Any]]:
+        """
+        Re-hash every blob referenced by the manifest.
+
+        Returns:
+            List of problems, one dict per bad entry:
+            {'file_id': str, 'path': str, 'error': str}
+            An empty list means the store is intact.
+        """
+        with self._lock:
+            entries = dict(self._manifest)
+
+        problems = []
+        for file_id, entry in entries.items():
+            blob = self.blob_path(entry['sha256'])
+            error = None
+            if not os.path.exists(blob):
+                error = "blob missing"
+            elif os.path.getsize(blob) != entry['size']:
+                error = f"size mismatch: expected {entry['size']}, found {os.path.getsize(blob)}"
+            elif sha256_file(blob) != entry['sha256']:
+                error = "sha256 mismatch"
+            if error:
+                problems.append({'file_id': file_id, 'path': entry['path'], 'error': error})
+        return problems
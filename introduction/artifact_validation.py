@@ -0,0 +1,173 @@
+"""
+Streaming structure checks for downloaded documents.
+
+Validators look at the bytes of a file as they are downloaded, keeping only
+its first and last few kilobytes, so no second read of the file is needed:
+- PDF: the "%PDF-" header, and "startxref" and "%%EOF" near the end
+- xlsx/docx/pptx (zip containers): the local file header signature, and an
+  end-of-central-directory record whose central directory offsets are
+  consistent with the file size
+
+A header that does not match raises ArtifactValidationError as soon as the
+first bytes arrive, so a corrupt download is abandoned immediately.
+
+Example:
+    >>> validator = validator_for("outputs/report.pdf")
+    >>> for chunk in chunks:
+    ...     validator.feed(chunk)
+    >>> validator.finish()
+"""
+
+import os
+import struct
+import time
+from typing import Optional
+
+# Bytes of the end of a file kept for trailer checks. The zip
+# end-of-central-directory record is 22 bytes plus a comment of up to
+# 65535 bytes; the rest lets small central directories be checked too.
+TAIL_SIZE = 128 * 1024
+
+_ZIP_LOCAL_HEADER = b"PK\x03\x04"
+_ZIP_CENTRAL_HEADER = b"PK\x01\x02"
+_ZIP_END_RECORD = b"PK\x05\x06"
+_ZIP_END_RECORD_SIZE = 22
+_ZIP64_MARKER = 0xFFFFFFFF
+
+
+class ArtifactValidationError(Exception):
+    """Raised when downloaded bytes are not a well-formed document."""
+
+
+class StreamValidator:
+    """
+    Base class: collects the head and tail of a stream and times the checks.
+
+    Subclasses set HEADER and KIND and implement _check_tail().
+    ``elapsed`` is the time in seconds spent inside the validator.
+    """
+
+    HEADER = b""
+    KIND = "file"
+
+    def __init__(self):
+        self.size = 0
+        self.elapsed = 0.0
+        self._head = b""
+        self._tail = bytearray()
+
+    def seed(self, path: str) -> None:
+        """Start from the bytes already downloaded to path (resumed downloads)."""
+        started = time.perf_counter()
+        try:
+            size = os.path.getsize(path)
+            with open(path, 'rb') as f:
+                head = f.read(len(self.HEADER))
+                f.seek(max(0, size - TAIL_SIZE))
+                tail = f.read()
+            self._head = b""
+            self._check_head(head)
+            self._tail = bytearray(tail)
+            self.size = size
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+    def feed(self, chunk: bytes) -> None:
+        """Process the next chunk; raises ArtifactValidationError on a bad header."""
+        started = time.perf_counter()
+        try:
+            if len(self._head) < len(self.HEADER):
+                self._check_head(chunk)
+            self.size += len(chunk)
+            self._tail += chunk
+            if len(self._tail) > TAIL_SIZE:
+                del self._tail[:len(self._tail) - TAIL_SIZE]
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+    def _check_head(self, data: bytes) -> None:
+        self._head += data[:len(self.HEADER) - len(self._head)]
+        if not self.HEADER.startswith(self._head):
+            raise ArtifactValidationError(f"Invalid {self.KIND}: unexpected file header {self._head!r}")
+
+    def finish(self) -> None:
+        """Run the end-of-file checks; raises ArtifactValidationError on failure."""
+        started = time.perf_counter()
+        try:
+            if self._head != self.HEADER:
+                raise ArtifactValidationError(f"Invalid {self.KIND}: file is too short ({self.size} bytes)")
+            self._check_tail(bytes(self._tail))
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+    def _check_tail(self, tail: bytes) -> None:
+        raise NotImplementedError
+
+
+class PdfValidator(StreamValidator):
+    """Checks the PDF header and the startxref/%%EOF trailer."""
+
+    HEADER = b"%PDF-"
+    KIND = "PDF"
+
+    def _check_tail(self, tail: bytes) -> None:
+        # Writers may append whitespace or a few bytes after the marker
+        end = tail[-1024:]
+        if b"%%EOF" not in end:
+            raise ArtifactValidationError("Invalid PDF: missing %%EOF trailer (truncated file?)")
+        if b"startxref" not in end:
+            raise ArtifactValidationError("Invalid PDF: missing startxref before %%EOF")
+
+
+class ZipValidator(StreamValidator):
+    """Checks the zip signature and the end-of-central-directory record."""
+
+    HEADER = _ZIP_LOCAL_HEADER
+    KIND = "zip document"
+
+    def _check_tail(self, tail: bytes) -> None:
+        position = tail.rfind(_ZIP_END_RECORD, 0, len(tail) - _ZIP_END_RECORD_SIZE + 4)
+        if position < 0:
+            raise ArtifactValidationError(
+                f"Invalid {self.KIND}: end of central directory not found (truncated file?)"
+            )
+
+        (_, _, _, _, entries, cd_size, cd_offset, comment_length) = struct.unpack(
+            "<4sHHHHIIH", tail[position:position + _ZIP_END_RECORD_SIZE]
+        )
+        end_offset = self.size - len(tail) + position
+        if entries == 0:
+            raise ArtifactValidationError(f"Invalid {self.KIND}: archive has no entries")
+        if end_offset + _ZIP_END_RECORD_SIZE + comment_length > self.size:
+            raise ArtifactValidationError(f"Invalid {self.KIND}: end of central directory is truncated")
+        if _ZIP64_MARKER in (cd_size, cd_offset):
+            # Zip64 archive; its real offsets live in another record
+            return
+        if cd_offset + cd_size > end_offset:
+            raise ArtifactValidationError(
+                f"Invalid {self.KIND}: central directory ({cd_offset}+{cd_size}) "
+                f"overlaps its end record at {end_offset}"
+            )
+
+        # Check the first central directory entry when it is still in the tail
+        start = cd_offset - (self.size - len(tail))
+        if start >= 0 and tail[start:start + 4] != _ZIP_CENTRAL_HEADER:
+            raise ArtifactValidationError(f"Invalid {self.KIND}: bad central directory signature")
+
+
+class OfficeValidator(ZipValidator):
+    KIND = "Office document"
+
+
+_VALIDATORS = {
+    ".pdf": PdfValidator,
+    ".xlsx": OfficeValidator,
+    ".docx": OfficeValidator,
+    ".pptx": OfficeValidator,
+}
+
+
+def validator_for(path: str) -> Optional[StreamValidator]:
+    """Return a validator for path's file type, or None if it is not checked."""
+    validator_class = _VALIDATORS.get(os.path.splitext(path)[1].lower())
+    return validator_class() if validator_class else None
@@ -0,0 +1,355 @@
+"""
+Async counterparts of the file_utils helpers for asyncio applications.
+
+The functions here take an AsyncAnthropic client and return exactly the
+same result dicts as their synchronous versions in file_utils. Disk I/O is
+moved off the event loop with run_in_executor, and download_all_files()
+bounds its fan-out with a semaphore. The metadata cache, artifact store,
+retry decisions and result bookkeeping are shared with file_utils; only
+the I/O calls differ.
+
+Example:
+    >>> client = AsyncAnthropic(api_key="...")
+    >>> response = await client.beta.messages.create(...)
+    >>> results = await download_all_files(client, response, output_dir="outputs")
+    >>> print_download_summary(results)
+"""
+
+import asyncio
+import os
+import time
+from functools import partial
+from typing import Optional, List, Dict, Any
+
+from anthropic import AsyncAnthropic
+
+from artifact_store import ArtifactStore
+from file_utils import (
+    DEFAULT_BACKOFF_BASE,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_BULK_METADATA_THRESHOLD,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_LIST_PAGE_SIZE,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_MAX_WORKERS,
+    MetadataCache,
+    MetricsCallback,
+    OutputPaths,
+    ProgressCallback,
+    _Attempt,
+    _default_max_pages,
+    _file_info_to_dict,
+    _finish_download,
+    _index_page,
+    _new_result,
+    _partial_path,
+    _partial_size,
+    _prepare_output,
+    _range_headers,
+    _record_download,
+    _retry_delay,
+    _split_cached,
+    _start_attempts,
+    _stored_filename,
+    _use_stored,
+    extract_file_ids,
+    get_metadata_cache,
+)
+
+
+async def _run_sync(func, *args, **kwargs):
+    """Run a blocking function in the default executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+
+
+async def _lookup_metadata(
+    client: AsyncAnthropic,
+    file_id: str,
+    cache: Optional[MetadataCache] = None
+) -> Dict[str, Any]:
+    """Async version of file_utils._lookup_metadata()."""
+    cache = cache if cache is not None else get_metadata_cache()
+    info = cache.get(file_id)
+    if info is None:
+        file_info = await client.beta.files.retrieve_metadata(file_id=file_id)
+        info = _file_info_to_dict(file_info)
+        cache.set(file_id, info)
+    return info
+
+
+async def _stream_attempt(
+    client: AsyncAnthropic,
+    file_id: str,
+    part_path: str,
+    chunk_size: int,
+    progress_callback: Optional[ProgressCallback],
+    want_hash: bool,
+    result: Dict[str, Any],
+    started: float,
+    validate_as: Optional[str] = None
+):
+    """Async version of file_utils._stream_attempt()."""
+    offset = await _run_sync(_partial_size, part_path)
+    async with client.beta.files.with_streaming_response.download(
+        file_id=file_id, extra_headers=_range_headers(offset)
+    ) as response:
+        attempt = _Attempt(
+            result, started, offset, response.status_code, want_hash, validate_as, progress_callback
+        )
+        with attempt.validating():
+            await _run_sync(attempt.load_partial, part_path, chunk_size)
+            f = await _run_sync(open, part_path, attempt.mode)
+            try:
+                async for chunk in response.iter_bytes(chunk_size):
+                    attempt.check(chunk)
+                    await _run_sync(f.write, chunk)
+                    attempt.record(chunk)
+            finally:
+                await _run_sync(f.close)
+            return attempt.finish()
+
+
+async def _stream_to_file(
+    client: AsyncAnthropic,
+    file_id: str,
+    output_path: str,
+    chunk_size: int,
+    progress_callback: Optional[ProgressCallback],
+    result: Dict[str, Any],
+    started: float,
+    want_hash: bool,
+    max_retries: int,
+    backoff_base: float,
+    backoff_max: float,
+    validate: bool = True
+) -> Optional[str]:
+    """Async version of file_utils._stream_to_file()."""
+    part_path = _partial_path(output_path, file_id)
+    # Retries are handled here, not stacked on the SDK's own
+    client = client.with_options(max_retries=0)
+    _start_attempts(result)
+
+    while True:
+        result['attempts'] += 1
+        try:
+            written, resumed, digest = await _stream_attempt(
+                client, file_id, part_path, chunk_size, progress_callback, want_hash,
+                result, started, validate_as=output_path if validate else None
+            )
+            break
+        except Exception as e:
+            delay = await _run_sync(
+                _retry_delay, e, result, part_path, max_retries, backoff_base, backoff_max
+            )
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+
+    await _run_sync(os.replace, part_path, output_path)
+    result['resumed_bytes'] = resumed
+    result['size'] = written
+    return digest
+
+
+async def download_file(
+    client: AsyncAnthropic,
+    file_id: str,
+    output_path: str,
+    overwrite: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress_callback: Optional[ProgressCallback] = None,
+    store: Optional[ArtifactStore] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_base: float = DEFAULT_BACKOFF_BASE,
+    backoff_max: float = DEFAULT_BACKOFF_MAX,
+    metrics_callback: Optional[MetricsCallback] = None,
+    validate: bool = True,
+    filename: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Download a file from Claude's Files API and save it locally.
+
+    Async version of file_utils.download_file(); takes the same arguments
+    (with an AsyncAnthropic client) and returns the same result dict.
+
+    Example:
+        >>> client = AsyncAnthropic(api_key="...")
+        >>> result = await download_file(client, "file_abc123", "outputs/report.xlsx")
+        >>> if result['success']:
+        ...     print(f"Downloaded {result['size']} bytes to {result['output_path']}")
+    """
+    result = _new_result(file_id, output_path)
+    started = time.perf_counter()
+
+    try:
+        file_exists = await _run_sync(_prepare_output, result, output_path, overwrite)
+        if file_exists is None:
+            return _finish_download(result, started, metrics_callback)
+
+        # Reuse content we already have instead of downloading it again
+        if await _run_sync(_use_stored, result, store, file_id, output_path, file_exists):
+            return _finish_download(result, started, metrics_callback)
+
+        # Stream file content from Files API (beta namespace) to disk
+        digest = await _stream_to_file(
+            client, file_id, output_path, chunk_size, progress_callback, result, started,
+            want_hash=store is not None,
+            max_retries=max_retries,
+            backoff_base=backoff_base,
+            backoff_max=backoff_max,
+            validate=validate
+        )
+        await _run_sync(
+            _record_download, result, store, file_id, output_path, digest, filename, file_exists
+        )
+
+    except Exception as e:
+        result['error'] = str(e)
+
+    return _finish_download(result, started, metrics_callback)
+
+
+async def prefetch_metadata(
+    client: AsyncAnthropic,
+    file_ids: List[str],
+    cache: Optional[MetadataCache] = None,
+    page_size: int = DEFAULT_LIST_PAGE_SIZE,
+    max_pages: Optional[int] = None,
+    fallback: bool = True
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Resolve metadata for many file IDs with a few Files API list calls.
+
+    Async version of file_utils.prefetch_metadata().
+    """
+    cache = cache if cache is not None else get_metadata_cache()
+    resolved, missing = _split_cached(cache, file_ids)
+
+    if missing:
+        if max_pages is None:
+            max_pages = _default_max_pages(missing, page_size)
+        try:
+            page = await client.beta.files.list(limit=page_size)
+            pages = 1
+            while _index_page(page, cache, missing, resolved, pages, max_pages):
+                page = await page.get_next_page()
+                pages += 1
+        except Exception as e:
+            print(f"Warning: Could not list files, falling back to per-file lookups: {e}")
+
+    # Fall back to per-ID lookups for anything the listing did not cover
+    if fallback and missing:
+        lookups = await asyncio.gather(
+            *(_lookup_metadata(client, file_id, cache) for file_id in file_ids if file_id in missing),
+            return_exceptions=True
+        )
+        for info in lookups:
+            if isinstance(info, dict):
+                resolved[info['file_id']] = info
+
+    return resolved
+
+
+async def download_all_files(
+    client: AsyncAnthropic,
+    response,
+    output_dir: str = "outputs",
+    prefix: str = "",
+    overwrite: bool = True,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    cache: Optional[MetadataCache] = None,
+    store: Optional[ArtifactStore] = None,
+    bulk_metadata_threshold: int = DEFAULT_BULK_METADATA_THRESHOLD,
+    metrics_callback: Optional[MetricsCallback] = None
+) -> List[Dict[str, Any]]:
+    """
+    Extract and download all files from a Claude API response.
+
+    Async version of file_utils.download_all_files(). At most max_workers
+    files are in flight at once (bounded by a semaphore), files sharing a
+    name get distinct paths, and results are returned in the order
+    reported by extract_file_ids().
+
+    Example:
+        >>> response = await client.beta.messages.create(...)
+        >>> results = await download_all_files(client, response, max_workers=8)
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+    cache = cache if cache is not None else get_metadata_cache()
+    file_ids = extract_file_ids(response)
+
+    if bulk_metadata_threshold > 0:
+        uncached = [
+            file_id for file_id in file_ids
+            if cache.get(file_id) is None and _stored_filename(store, file_id) is None
+        ]
+        if len(uncached) >= bulk_metadata_threshold:
+            # Misses are looked up concurrently by the download tasks
+            await prefetch_metadata(client, uncached, cache, fallback=False)
+
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def resolve(index: int, file_id: str) -> str:
+        async with semaphore:
+            # Stored files keep their name without a metadata request
+            filename = _stored_filename(store, file_id)
+            if filename is None:
+                # Try to get file metadata for proper filename
+                try:
+                    filename = (await _lookup_metadata(client, file_id, cache))['filename']
+                except Exception:
+                    # If we can't get metadata, use a generic filename
+                    filename = f"file_{index}.bin"
+            return filename
+
+    async def fetch(file_id: str, filename: str, output_path: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await download_file(
+                client, file_id, output_path, overwrite=overwrite, store=store,
+                metrics_callback=metrics_callback, filename=filename
+            )
+
+    # Filenames are resolved first so that files sharing a name get distinct
+    # paths, numbered in file order; gather() keeps the order it was given
+    filenames = await asyncio.gather(
+        *(resolve(index, file_id) for index, file_id in enumerate(file_ids, 1))
+    )
+    paths = OutputPaths()
+    downloads = [
+        (file_id, filename, paths.claim(os.path.join(output_dir, f"{prefix}{filename}")))
+        for file_id, filename in zip(file_ids, filenames)
+    ]
+    results = await asyncio.gather(*(fetch(*download) for download in downloads))
+
+    try:
+        await _run_sync(cache.save)
+    except OSError as e:
+        print(f"Warning: Could not save metadata cache: {e}")
+
+    return list(results)
+
+
+async def get_file_info(
+    client: AsyncAnthropic,
+    file_id: str,
+    cache: Optional[MetadataCache] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Retrieve metadata about a file from the Files API.
+
+    Async version of file_utils.get_file_info(); served from the shared
+    metadata cache when available.
+
+    Example:
+        >>> info = await get_file_info(client, "file_abc123")
+        >>> if info:
+        ...     print(f"Filename: {info['filename']}")
+    """
+    try:
+        return await _lookup_metadata(client, file_id, cache)
+    except Exception as e:
+        print(f"Error retrieving file info: {e}")
+        return None
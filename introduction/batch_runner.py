@@ -0,0 +1,295 @@
+"""
+Batch document generation from a JSONL prompt file.
+
+Each line of the prompt file describes one document request:
+
+    {"id": "q3-budget", "prompt": "Create a Q3 budget spreadsheet...", "skills": ["xlsx"], "output_prefix": "q3_"}
+
+"id" defaults to the line number, "skills" to all document skills and
+"output_prefix" to "<id>_". Requests are sent either through the Message
+Batches API (--mode batch) or through a bounded pool of concurrent
+requests (--mode pool), and every generated file is downloaded with the
+file_utils helpers.
+
+Progress is saved to a state file after every change, so an interrupted
+run picks up where it stopped: finished items are skipped and a submitted
+batch is polled again instead of being resubmitted.
+
+Usage:
+    python batch_runner.py prompts.jsonl
+    python batch_runner.py prompts.jsonl --mode batch --state nightly_state.json
+    python batch_runner.py prompts.jsonl --mode pool --workers 8
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+from anthropic import Anthropic
+
+from file_utils import download_all_files
+from json_files import save_json
+from skill_request import build_skill_request
+
+# Item states recorded in the state file
+PENDING = "pending"
+SUBMITTED = "submitted"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_POLL_INTERVAL = 30
+
+
+def load_prompts(path: str) -> List[Dict[str, Any]]:
+    """
+    Read and validate a JSONL prompt file.
+
+    Raises:
+        ValueError: If a line is not valid JSON, has no prompt, or repeats an id
+    """
+    items = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}")
+            if not entry.get('prompt'):
+                raise ValueError(f"{path}:{line_number}: missing 'prompt'")
+
+            item_id = str(entry.get('id', line_number))
+            if item_id in seen:
+                raise ValueError(f"{path}:{line_number}: duplicate id {item_id!r}")
+            seen.add(item_id)
+
+            items.append({
+                'id': item_id,
+                'prompt': entry['prompt'],
+                'skills': entry.get('skills'),
+                'output_prefix': entry.get('output_prefix', f"{item_id}_")
+            })
+    return items
+
+
+def _custom_id(item_id: str) -> str:
+    """Batch custom_ids allow only 1-64 characters of [a-zA-Z0-9_-]."""
+    return re.sub(r"[^a-zA-Z0-9_-]", "_", item_id)[:64]
+
+
+class BatchState:
+    """Per-item status persisted to a JSON file after every update."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data = {'batch_id': None, 'items': {}}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+
+    def item(self, item_id: str) -> Dict[str, Any]:
+        return self.data['items'].setdefault(item_id, {'status': PENDING, 'attempts': 0})
+
+    def update(self, item_id: str, **fields) -> None:
+        with self._lock:
+            self.item(item_id).update(fields)
+            self._save()
+
+    def set_batch_id(self, batch_id: Optional[str]) -> None:
+        with self._lock:
+            self.data['batch_id'] = batch_id
+            self._save()
+
+    def _save(self) -> None:
+        # Caller holds self._lock
+        save_json(self.path, self.data, indent=2)
+
+
+def _record_downloads(
+    client: Anthropic,
+    state: BatchState,
+    item: Dict[str, Any],
+    message,
+    output_dir: str,
+    download_workers: int,
+    started: float
+) -> None:
+    """Download the files of a finished message and record the outcome."""
+    results = download_all_files(
+        client, message, output_dir=output_dir,
+        prefix=item['output_prefix'], max_workers=download_workers
+    )
+    files = [
+        {k: r.get(k) for k in ('file_id', 'output_path', 'size', 'success', 'error')}
+        for r in results
+    ]
+    failed = [f for f in files if not f['success']]
+    state.update(
+        item['id'],
+        status=FAILED if failed else DONE,
+        files=files,
+        error=f"{len(failed)} file download(s) failed" if failed else None,
+        elapsed=time.perf_counter() - started
+    )
+    status = "✗" if failed else "✓"
+    print(f"{status} [{item['id']}] {len(files) - len(failed)}/{len(files)} file(s) downloaded")
+
+
+def run_pool(
+    client: Anthropic,
+    items: List[Dict[str, Any]],
+    state: BatchState,
+    output_dir: str,
+    workers: int = 4,
+    download_workers: int = 4
+) -> None:
+    """Send each pending item as its own request on a bounded thread pool."""
+
+    def run_item(item: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        state.update(item['id'], status=SUBMITTED, attempts=state.item(item['id'])['attempts'] + 1)
+        try:
+            message = client.beta.messages.create(
+                **build_skill_request(item['prompt'], item['skills'])
+            )
+            _record_downloads(client, state, item, message, output_dir, download_workers, started)
+        except Exception as e:
+            state.update(item['id'], status=FAILED, error=str(e), elapsed=time.perf_counter() - started)
+            print(f"✗ [{item['id']}] {e}")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(run_item, items))
+
+
+def run_batch(
+    client: Anthropic,
+    items: List[Dict[str, Any]],
+    state: BatchState,
+    output_dir: str,
+    download_workers: int = 4,
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> None:
+    """Submit pending items as one Message Batch, wait for it and download results."""
+    by_custom_id = {_custom_id(item['id']): item for item in items}
+    if len(by_custom_id) != len(items):
+        raise ValueError("Item ids collide after conversion to batch custom_ids")
+
+    batch_id = state.data.get('batch_id')
+    if batch_id:
+        print(f"Resuming batch {batch_id}")
+    else:
+        requests = []
+        betas = None
+        for custom_id, item in by_custom_id.items():
+            params = build_skill_request(item['prompt'], item['skills'])
+            # Beta flags go on the batch request, not on each item
+            betas = params.pop('betas')
+            requests.append({'custom_id': custom_id, 'params': params})
+        batch = client.beta.messages.batches.create(requests=requests, betas=betas)
+        batch_id = batch.id
+        state.set_batch_id(batch_id)
+        for item in items:
+            state.update(item['id'], status=SUBMITTED, attempts=state.item(item['id'])['attempts'] + 1)
+        print(f"Submitted batch {batch_id} with {len(requests)} request(s)")
+
+    started = time.perf_counter()
+    while True:
+        batch = client.beta.messages.batches.retrieve(batch_id)
+        if batch.processing_status == "ended":
+            break
+        counts = batch.request_counts
+        print(f"   Batch {batch_id}: {counts.processing} processing, {counts.succeeded} succeeded, "
+              f"{counts.errored} errored")
+        time.sleep(poll_interval)
+
+    for entry in client.beta.messages.batches.results(batch_id):
+        item = by_custom_id.get(entry.custom_id)
+        if item is None or state.item(item['id'])['status'] == DONE:
+            continue
+        if entry.result.type == "succeeded":
+            try:
+                _record_downloads(
+                    client, state, item, entry.result.message, output_dir, download_workers, started
+                )
+            except Exception as e:
+                state.update(item['id'], status=FAILED, error=str(e))
+                print(f"✗ [{item['id']}] {e}")
+        else:
+            error = getattr(entry.result, 'error', None)
+            state.update(item['id'], status=FAILED, error=f"{entry.result.type}: {error}")
+            print(f"✗ [{item['id']}] request {entry.result.type}")
+
+    # Items missing from the results are retried in the next batch
+    for item in items:
+        if state.item(item['id'])['status'] == SUBMITTED:
+            state.update(item['id'], status=FAILED, error="no result returned")
+    state.set_batch_id(None)
+
+
+def print_batch_report(state: BatchState, items: List[Dict[str, Any]], elapsed: float) -> None:
+    """Print per-status counts and throughput for the items of this run."""
+    entries = [state.item(item['id']) for item in items]
+    done = [e for e in entries if e['status'] == DONE]
+    failed = [e for e in entries if e['status'] == FAILED]
+    files = [f for e in entries for f in e.get('files', []) if f['success']]
+    total_mb = sum(f['size'] for f in files) / (1024 * 1024)
+
+    print("\nBatch Summary")
+    print("=" * 50)
+    print(f"Items: {len(done)} done, {len(failed)} failed, {len(entries)} total")
+    print(f"Files: {len(files)} downloaded ({total_mb:.2f} MB)")
+    print(f"Wall time: {elapsed:.1f} s")
+    if elapsed > 0:
+        print(f"Throughput: {len(done) / elapsed * 60:.1f} items/min, "
+              f"{len(files) / elapsed:.2f} files/s, {total_mb / elapsed:.2f} MB/s")
+    for item, entry in zip(items, entries):
+        if entry['status'] == FAILED:
+            print(f"✗ {item['id']} - Error: {entry.get('error')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate documents for every prompt in a JSONL file.")
+    parser.add_argument("prompts", help="JSONL file with one request per line")
+    parser.add_argument("--mode", choices=["pool", "batch"], default="pool",
+                        help="Concurrent requests (pool) or the Message Batches API (batch)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests in pool mode")
+    parser.add_argument("--download-workers", type=int, default=4, help="Concurrent downloads per item")
+    parser.add_argument("--output-dir", default=str(Path.cwd().parent / "outputs"), help="Where files are saved")
+    parser.add_argument("--state", help="State file for resuming (default: <prompts>.state.json)")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Seconds between batch status checks")
+    args = parser.parse_args()
+
+    try:
+        items = load_prompts(args.prompts)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+    state = BatchState(args.state or f"{args.prompts}.state.json")
+    pending = [item for item in items if state.item(item['id'])['status'] != DONE]
+    print(f"{len(items)} item(s), {len(items) - len(pending)} already done, {len(pending)} to run")
+
+    from anthropic_client_init import client
+
+    started = time.perf_counter()
+    if pending:
+        if args.mode == "batch":
+            run_batch(client, pending, state, args.output_dir, args.download_workers, args.poll_interval)
+        else:
+            run_pool(client, pending, state, args.output_dir, args.workers, args.download_workers)
+    print_batch_report(state, items, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
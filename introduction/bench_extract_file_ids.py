@@ -0,0 +1,142 @@
+"""
+Micro-benchmark for file_utils.extract_file_ids().
+
+Builds synthetic responses with thousands of content blocks (text, beta
+bash_code_execution_tool_result blocks and large legacy tool_result
+outputs) and compares the single-pass extractor with the previous
+implementation. No API key or network access is needed.
+
+Usage:
+    python bench_extract_file_ids.py
+    python bench_extract_file_ids.py --blocks 5000 --output-kb 32 --repeat 5
+"""
+
+import argparse
+import json
+import random
+import time
+from types import SimpleNamespace
+
+from file_utils import FileIdExtractor, extract_file_ids
+
+
+def legacy_extract_file_ids(response):
+    """The extractor as it was before the single-pass rewrite, for comparison."""
+    file_ids = []
+
+    for block in response.content:
+        if block.type == "bash_code_execution_tool_result":
+            try:
+                if hasattr(block, 'content') and hasattr(block.content, 'content'):
+                    for item in block.content.content:
+                        if hasattr(item, 'file_id'):
+                            file_ids.append(item.file_id)
+            except Exception:
+                continue
+
+        elif block.type == "tool_result":
+            try:
+                if hasattr(block, 'output'):
+                    output_str = str(block.output)
+                    if 'file_id' in output_str.lower():
+                        try:
+                            output_json = json.loads(output_str)
+                            if isinstance(output_json, dict) and 'file_id' in output_json:
+                                file_ids.append(output_json['file_id'])
+                            elif isinstance(output_json, list):
+                                for item in output_json:
+                                    if isinstance(item, dict) and 'file_id' in item:
+                                        file_ids.append(item['file_id'])
+                        except json.JSONDecodeError:
+                            import re
+                            pattern = r"file_id['\"]?\s*[:=]\s*['\"]?([a-zA-Z0-9_-]+)"
+                            matches = re.findall(pattern, output_str)
+                            file_ids.extend(matches)
+            except Exception:
+                continue
+
+    seen = set()
+    unique_file_ids = []
+    for fid in file_ids:
+        if fid not in seen:
+            seen.add(fid)
+            unique_file_ids.append(fid)
+    return unique_file_ids
+
+
+def build_response(num_blocks: int, output_kb: int, seed: int = 0):
+    """Build a synthetic response object shaped like the SDK's."""
+    rng = random.Random(seed)
+    filler_line = "drwxr-xr-x  2 user user 4096 Jan 15 10:00 some_directory_name\n"
+    filler = filler_line * max(1, (output_kb * 1024) // len(filler_line))
+    blocks = []
+
+    for i in range(num_blocks):
+        kind = rng.random()
+        if kind < 0.3:
+            blocks.append(SimpleNamespace(type="text", text=f"Step {i}: working..."))
+        elif kind < 0.5:
+            items = [SimpleNamespace(type="bash_code_execution_output", file_id=f"file_bash_{i}")]
+            blocks.append(SimpleNamespace(
+                type="bash_code_execution_tool_result",
+                content=SimpleNamespace(content=items)
+            ))
+        elif kind < 0.7:
+            # Large plain-text output containing one file ID near the end
+            output = f"{filler}saved report, file_id: file_text_{i}\n"
+            blocks.append(SimpleNamespace(type="tool_result", output=output))
+        elif kind < 0.8:
+            output = json.dumps([{"file_id": f"file_json_{i}", "log": filler[:2048]}])
+            blocks.append(SimpleNamespace(type="tool_result", output=output))
+        else:
+            # Large output without any file IDs (the common case)
+            blocks.append(SimpleNamespace(type="tool_result", output=filler))
+
+    return SimpleNamespace(content=blocks)
+
+
+def best_of(func, response, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(response)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extract_file_ids()")
+    parser.add_argument("--blocks", type=int, default=2000, help="Content blocks per response")
+    parser.add_argument("--output-kb", type=int, default=16, help="Size of each large tool output in KB")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    response = build_response(args.blocks, args.output_kb)
+
+    expected = legacy_extract_file_ids(response)
+    actual = extract_file_ids(response)
+    if actual != expected:
+        raise SystemExit("Mismatch between legacy and current extractor results")
+
+    legacy_time = best_of(legacy_extract_file_ids, response, args.repeat)
+    current_time = best_of(extract_file_ids, response, args.repeat)
+
+    # Incremental path: feed blocks one at a time as a stream would
+    def incremental(resp):
+        extractor = FileIdExtractor()
+        for block in resp.content:
+            extractor.feed_block(block)
+        return extractor.file_ids
+
+    incremental_time = best_of(incremental, response, args.repeat)
+
+    print("\nextract_file_ids Benchmark")
+    print("=" * 50)
+    print(f"Blocks: {args.blocks}, tool output size: {args.output_kb} KB, files found: {len(actual)}")
+    print(f"Legacy:      {legacy_time * 1000:8.2f} ms")
+    print(f"Single-pass: {current_time * 1000:8.2f} ms ({legacy_time / current_time:.1f}x)")
+    print(f"Incremental: {incremental_time * 1000:8.2f} ms ({legacy_time / incremental_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
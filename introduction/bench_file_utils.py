@@ -0,0 +1,205 @@
+"""
+Offline benchmark suite for file_utils.
+
+Serves synthetic files from a local Files API stand-in (fake_files_server)
+and drives the real Anthropic client against it, so extract_file_ids(),
+download_file() and download_all_files() can be measured without an API
+key or network access. Each scenario runs in its own process so that its
+peak RSS is reported separately.
+
+Usage:
+    python bench_file_utils.py
+    python bench_file_utils.py --count 50 --size-kb 4096 --latency 0.1 --workers 8
+    python bench_file_utils.py --json > bench_output.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+from typing import Optional, List, Dict, Any
+from types import SimpleNamespace
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from anthropic import Anthropic
+
+from bench_extract_file_ids import build_response
+from fake_files_server import FakeFilesServer
+from file_utils import (
+    MetadataCache,
+    download_all_files,
+    download_file,
+    extract_file_ids,
+    percentile,
+)
+
+SCENARIOS = [
+    "extract_file_ids",
+    "download_file",
+    "download_all_files (serial)",
+    "download_all_files (concurrent)",
+]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, if available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def files_response(file_ids: List[str]):
+    """Build a response whose tool results reference the given file IDs."""
+    items = [SimpleNamespace(type="bash_code_execution_output", file_id=fid) for fid in file_ids]
+    block = SimpleNamespace(
+        type="bash_code_execution_tool_result",
+        content=SimpleNamespace(content=items)
+    )
+    return SimpleNamespace(content=[block])
+
+
+def run_scenario(name: str, base_url: str, file_ids: List[str], args) -> Dict[str, Any]:
+    """
+    Run one scenario and return its raw measurements.
+
+    Latencies are per call for extract_file_ids and per file (the
+    result's wall_time) for the download scenarios.
+    """
+    latencies = []
+    units = 0
+    total_bytes = 0
+
+    client = Anthropic(api_key="offline-benchmark", base_url=base_url, max_retries=0)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+
+        if name == "extract_file_ids":
+            response = build_response(args.blocks, args.output_kb)
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                extract_file_ids(response)
+                latencies.append(time.perf_counter() - t0)
+                units += args.blocks
+
+        elif name == "download_file":
+            for _ in range(args.repeat):
+                for file_id in file_ids:
+                    t0 = time.perf_counter()
+                    result = download_file(client, file_id, f"{output_dir}/{file_id}.bin")
+                    latencies.append(time.perf_counter() - t0)
+                    total_bytes += result['size']
+                    units += 1
+
+        else:
+            workers = 1 if name.endswith("(serial)") else args.workers
+            response = files_response(file_ids)
+            for _ in range(args.repeat):
+                results = download_all_files(
+                    client, response, output_dir=output_dir,
+                    max_workers=workers, cache=MetadataCache()
+                )
+                latencies.extend(r['wall_time'] for r in results)
+                total_bytes += sum(r['size'] for r in results)
+                units += len(results)
+
+        elapsed = time.perf_counter() - start
+
+    return {
+        'scenario': name,
+        'latencies': latencies,
+        'units': units,
+        'bytes': total_bytes,
+        'elapsed': elapsed,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def _scenario_worker(queue, name, base_url, file_ids, args):
+    queue.put(run_scenario(name, base_url, file_ids, args))
+
+
+def run_isolated(name: str, base_url: str, file_ids: List[str], args) -> Dict[str, Any]:
+    """Run a scenario in a fresh process so its peak RSS is its own."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_scenario_worker, args=(queue, name, base_url, file_ids, args))
+    process.start()
+    measurement = queue.get()
+    process.join()
+    return measurement
+
+
+def summarize(measurement: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn raw measurements into throughput and latency figures."""
+    elapsed = measurement['elapsed'] or 1e-9
+    latencies = measurement['latencies']
+    return {
+        'scenario': measurement['scenario'],
+        'units_per_s': measurement['units'] / elapsed,
+        'mb_per_s': measurement['bytes'] / (1024 * 1024) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000 if latencies else None,
+        'p99_ms': percentile(latencies, 99) * 1000 if latencies else None,
+        'peak_rss_mb': measurement['peak_rss_mb']
+    }
+
+
+def print_report(summaries: List[Dict[str, Any]], args) -> None:
+    print("\nfile_utils Offline Benchmark")
+    print("=" * 90)
+    print(f"Files: {args.count} x {args.size_kb} KB, latency: {args.latency * 1000:.0f} ms, "
+          f"workers: {args.workers}, repeat: {args.repeat}")
+    print("-" * 90)
+    print(f"{'Scenario':<34}{'units/s':>10}{'MB/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak RSS MB':>14}")
+    for s in summaries:
+        rss = f"{s['peak_rss_mb']:.1f}" if s['peak_rss_mb'] is not None else "n/a"
+        print(f"{s['scenario']:<34}{s['units_per_s']:>10.1f}{s['mb_per_s']:>10.2f}"
+              f"{s['p50_ms']:>10.2f}{s['p99_ms']:>10.2f}{rss:>14}")
+    print("\nunits are blocks for extract_file_ids and files for the download scenarios;")
+    print("latency is per call for extract_file_ids and per file otherwise.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for file_utils")
+    parser.add_argument("--count", type=int, default=20, help="Number of synthetic files")
+    parser.add_argument("--size-kb", type=int, default=1024, help="Size of each file in KB")
+    parser.add_argument("--latency", type=float, default=0.05, help="Server latency per request in seconds")
+    parser.add_argument("--bandwidth-mbps", type=float, default=None, help="Optional per-connection bandwidth cap in MB/s")
+    parser.add_argument("--workers", type=int, default=8, help="max_workers for the concurrent scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per scenario")
+    parser.add_argument("--blocks", type=int, default=2000, help="Content blocks for extract_file_ids")
+    parser.add_argument("--output-kb", type=int, default=16, help="Tool output size for extract_file_ids")
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="Run only these scenarios")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    # One shared payload keeps the server's own memory use small
+    payload = bytes(range(256)) * (args.size_kb * 4)
+    file_ids = [f"file_bench_{i:04d}" for i in range(args.count)]
+    bandwidth = args.bandwidth_mbps * 1024 * 1024 if args.bandwidth_mbps else None
+
+    summaries = []
+    with FakeFilesServer(
+        {file_id: payload for file_id in file_ids},
+        latency=args.latency,
+        bandwidth=bandwidth
+    ) as server:
+        for name in args.scenario or SCENARIOS:
+            summaries.append(summarize(run_isolated(name, server.base_url, file_ids, args)))
+
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        print_report(summaries, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Local stand-in for the Files API, for offline testing and benchmarking.
+
+Serves synthetic files over HTTP on 127.0.0.1 using the same routes the
+Anthropic SDK calls (metadata, content download with Range support, and
+paginated listing), with optional latency, bandwidth limits and injected
+faults. It also answers message and message batch requests with canned
+responses that report generated files, so whole request-and-download
+pipelines can run offline. Point a real client at it with base_url:
+
+    >>> server = FakeFilesServer({"file_abc": b"hello"}, faults={"file_abc": [500, ("truncate", 2)]})
+    >>> with server:
+    ...     client = Anthropic(api_key="test", base_url=server.base_url, max_retries=0)
+    ...     result = download_file(client, "file_abc", "outputs/hello.txt")
+    >>> print(result['attempts'], server.stats['download'])
+"""
+
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, List, Dict, Any
+from urllib.parse import urlparse, parse_qs
+
+_CONTENT_ROUTE = re.compile(r"^/v1/files/([^/]+)/content$")
+_METADATA_ROUTE = re.compile(r"^/v1/files/([^/]+)$")
+_RANGE_HEADER = re.compile(r"^bytes=(\d+)-$")
+_BATCH_ROUTE = re.compile(r"^/v1/messages/batches/([^/]+)$")
+_BATCH_RESULTS_ROUTE = re.compile(r"^/v1/messages/batches/([^/]+)/results$")
+
+# Bytes written per socket send when streaming file content
+_SEND_CHUNK = 64 * 1024
+
+
+class FakeFilesServer:
+    """
+    Threaded HTTP server that imitates the Files API endpoints.
+
+    Args:
+        files: Mapping of file_id to file content
+        filenames: Optional mapping of file_id to filename (default: "<file_id>.bin")
+        latency: Seconds to wait before answering each request
+        bandwidth: Optional cap on download speed in bytes per second
+        support_ranges: Whether to honour "Range: bytes=N-" requests
+        faults: Optional mapping of file_id to a list of faults, consumed one
+            per download request. A fault is an int HTTP status to return,
+            or ("truncate", n) to drop the connection after n bytes.
+        message_file_ids: File IDs reported by every generated message
+            (default: all files)
+        batch_polls: Number of batch status requests answered with
+            "in_progress" before a batch ends
+
+    Request counts per endpoint are kept in ``stats``.
+    """
+
+    def __init__(
+        self,
+        files: Dict[str, bytes],
+        filenames: Optional[Dict[str, str]] = None,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+        support_ranges: bool = True,
+        faults: Optional[Dict[str, List[Any]]] = None,
+        message_file_ids: Optional[List[str]] = None,
+        batch_polls: int = 1
+    ):
+        self.files = files
+        self.filenames = filenames or {}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.support_ranges = support_ranges
+        self.faults = {file_id: list(plan) for file_id, plan in (faults or {}).items()}
+        self.message_file_ids = message_file_ids
+        self.batch_polls = batch_polls
+        self.batches = {}
+        self.containers = set()
+        self.stats = {
+            'metadata': 0, 'download': 0, 'list': 0, 'range': 0,
+            'messages': 0, 'batch_create': 0, 'batch_retrieve': 0, 'batch_results': 0
+        }
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeFilesServer":
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "FakeFilesServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def metadata(self, file_id: str) -> Dict[str, Any]:
+        return {
+            'id': file_id,
+            'type': 'file',
+            'filename': self.filenames.get(file_id, f"{file_id}.bin"),
+            'mime_type': 'application/octet-stream',
+            'size_bytes': len(self.files[file_id]),
+            'created_at': '2025-01-01T00:00:00Z',
+            'downloadable': True
+        }
+
+    def message(self, model: str, container_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build a finished message whose tool result reports the generated files.
+
+        The message runs in container_id when given, otherwise in a new container.
+        """
+        with self._lock:
+            self.stats['messages'] += 1
+            message_id = f"msg_fake{self.stats['messages']:06d}"
+            if container_id not in self.containers:
+                container_id = f"container_fake{len(self.containers) + 1:06d}"
+                self.containers.add(container_id)
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+        file_ids = self.message_file_ids if self.message_file_ids is not None else list(self.files)
+        return {
+            'id': message_id,
+            'type': 'message',
+            'role': 'assistant',
+            'model': model,
+            'content': [
+                {'type': 'text', 'text': f"Created {len(file_ids)} file(s)."},
+                {
+                    'type': 'bash_code_execution_tool_result',
+                    'tool_use_id': f"srvtoolu_{message_id}",
+                    'content': {
+                        'type': 'bash_code_execution_result',
+                        'stdout': '',
+                        'stderr': '',
+                        'return_code': 0,
+                        'content': [
+                            {'type': 'bash_code_execution_output', 'file_id': file_id}
+                            for file_id in file_ids
+                        ]
+                    }
+                }
+            ],
+            'container': {'id': container_id, 'expires_at': expires_at.isoformat(), 'skills': []},
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': {'input_tokens': 10, 'output_tokens': 10}
+        }
+
+    def batch(self, batch_id: str, count: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            batch = self.batches[batch_id]
+            if count:
+                batch['polls'] += 1
+            ended = batch['polls'] > self.batch_polls
+        total = len(batch['requests'])
+        return {
+            'id': batch_id,
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': {
+                'processing': 0 if ended else total,
+                'succeeded': total if ended else 0,
+                'errored': 0, 'canceled': 0, 'expired': 0
+            },
+            'created_at': '2025-01-01T00:00:00Z',
+            'expires_at': '2025-01-02T00:00:00Z',
+            'ended_at': '2025-01-01T00:01:00Z' if ended else None,
+            'archived_at': None,
+            'cancel_initiated_at': None,
+            'results_url': f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _next_fault(self, file_id: str):
+        with self._lock:
+            plan = self.faults.get(file_id)
+            return plan.pop(0) if plan else None
+
+
+def _make_handler(server: FakeFilesServer):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send_error(self, status: int, message: str) -> None:
+            self._send_json(status, {
+                'type': 'error',
+                'error': {'type': 'api_error', 'message': message}
+            })
+
+        def do_GET(self):
+            if server.latency:
+                time.sleep(server.latency)
+
+            url = urlparse(self.path)
+            match = _CONTENT_ROUTE.match(url.path)
+            if match:
+                return self._download(match.group(1))
+            if url.path == "/v1/files":
+                return self._list(parse_qs(url.query))
+            match = _METADATA_ROUTE.match(url.path)
+            if match:
+                return self._metadata(match.group(1))
+            match = _BATCH_RESULTS_ROUTE.match(url.path)
+            if match:
+                return self._batch_results(match.group(1))
+            match = _BATCH_ROUTE.match(url.path)
+            if match:
+                return self._batch_retrieve(match.group(1))
+            self._send_error(404, f"Unknown route: {url.path}")
+
+        def do_POST(self):
+            if server.latency:
+                time.sleep(server.latency)
+
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            url = urlparse(self.path)
+            if url.path == "/v1/messages":
+                container_id = (body.get('container') or {}).get('id')
+                return self._send_json(200, server.message(body.get('model', 'fake-model'), container_id))
+            if url.path == "/v1/messages/batches":
+                return self._batch_create(body)
+            self._send_error(404, f"Unknown route: {url.path}")
+
+        def _batch_create(self, body: Dict[str, Any]) -> None:
+            server._count('batch_create')
+            with server._lock:
+                batch_id = f"msgbatch_fake{len(server.batches) + 1:06d}"
+                server.batches[batch_id] = {'requests': body.get('requests', []), 'polls': 0}
+            self._send_json(200, server.batch(batch_id, count=False))
+
+        def _batch_retrieve(self, batch_id: str) -> None:
+            server._count('batch_retrieve')
+            if batch_id not in server.batches:
+                return self._send_error(404, f"Batch not found: {batch_id}")
+            self._send_json(200, server.batch(batch_id))
+
+        def _batch_results(self, batch_id: str) -> None:
+            server._count('batch_results')
+            if batch_id not in server.batches:
+                return self._send_error(404, f"Batch not found: {batch_id}")
+            lines = [
+                json.dumps({
+                    'custom_id': request['custom_id'],
+                    'result': {
+                        'type': 'succeeded',
+                        'message': server.message(request['params'].get('model', 'fake-model'))
+                    }
+                })
+                for request in server.batches[batch_id]['requests']
+            ]
+            payload = ("\n".join(lines) + "\n").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/binary")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _metadata(self, file_id: str) -> None:
+            server._count('metadata')
+            if file_id not in server.files:
+                return self._send_error(404, f"File not found: {file_id}")
+            self._send_json(200, server.metadata(file_id))
+
+        def _list(self, query: Dict[str, List[str]]) -> None:
+            server._count('list')
+            limit = int(query.get('limit', ['20'])[0])
+            # Accept both cursor styles used by SDK versions
+            cursor = (query.get('after_id') or query.get('page') or [None])[0]
+            file_ids = list(server.files)
+            start = file_ids.index(cursor) + 1 if cursor in server.files else 0
+            page = file_ids[start:start + limit]
+            has_more = start + limit < len(file_ids)
+            self._send_json(200, {
+                'data': [server.metadata(file_id) for file_id in page],
+                'has_more': has_more,
+                'first_id': page[0] if page else None,
+                'last_id': page[-1] if page else None,
+                'next_page': page[-1] if has_more and page else None
+            })
+
+        def _download(self, file_id: str) -> None:
+            server._count('download')
+            if file_id not in server.files:
+                return self._send_error(404, f"File not found: {file_id}")
+
+            fault = server._next_fault(file_id)
+            if isinstance(fault, int):
+                return self._send_error(fault, f"Injected fault {fault}")
+
+            data = server.files[file_id]
+            start = 0
+            range_match = _RANGE_HEADER.match(self.headers.get("Range", ""))
+            if server.support_ranges and range_match:
+                server._count('range')
+                start = int(range_match.group(1))
+                if start >= len(data):
+                    return self._send_error(416, "Range not satisfiable")
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(data) - start))
+            if server.support_ranges:
+                self.send_header("Accept-Ranges", "bytes")
+            self.end_headers()
+
+            end = len(data)
+            if isinstance(fault, tuple) and fault[0] == "truncate":
+                end = min(end, start + fault[1])
+
+            position = start
+            while position < end:
+                chunk = data[position:min(position + _SEND_CHUNK, end)]
+                self.wfile.write(chunk)
+                position += len(chunk)
+                if server.bandwidth:
+                    time.sleep(len(chunk) / server.bandwidth)
+
+            if end < len(data):
+                # Simulate a dropped connection mid-transfer
+                self.wfile.flush()
+                self.close_connection = True
+                self.connection.shutdown(2)
+
+    return Handler
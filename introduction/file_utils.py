@@ -5,100 +5,804 @@ This module provides helper functions for:
 - Extracting file IDs from Claude API responses
 - Downloading files via the Files API
 - Saving files to disk
+- Caching file metadata between calls
 """
 
+import hashlib
 import json
+import math
 import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from anthropic import Anthropic
+from typing import Optional, List, Dict, Any, Callable
+from anthropic import Anthropic, APIConnectionError, APIStatusError
+from artifact_store import ArtifactStore
+from artifact_validation import ArtifactValidationError, validator_for
+from json_files import load_json, save_json
 
+try:
+    # The HTTP library the SDK is built on: httpx2 in current releases
+    import httpx2 as httpx
+except ImportError:
+    import httpx
 
-def extract_file_ids(response) -> List[str]:
+# Default number of files fetched in parallel by download_all_files()
+DEFAULT_MAX_WORKERS = 4
+
+# Size of each chunk read from the Files API and written to disk
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Called after every chunk with (bytes_in_chunk, total_bytes_written)
+ProgressCallback = Callable[[int, int], None]
+
+# Retry policy for download_file(): retries after the first attempt and
+# exponential backoff bounds in seconds (full jitter is applied)
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 8.0
+
+# Called with the finished result dict of every download_file() call
+MetricsCallback = Callable[[Dict[str, Any]], None]
+
+# HTTP statuses below 500 that are worth retrying
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+# Raised when a connection drops or times out while a body is streamed
+_TRANSPORT_ERRORS = (httpx.TransportError,)
+
+# Files API list page size, and the number of uncached file IDs from which
+# download_all_files() resolves metadata by listing instead of per-ID lookups
+DEFAULT_LIST_PAGE_SIZE = 100
+DEFAULT_BULK_METADATA_THRESHOLD = 5
+
+
+class MetadataCache:
     """
-    Extract all file IDs from a Claude API response.
+    Thread-safe cache of Files API metadata keyed by file_id.
 
-    Skills create files during code execution and return file_id attributes
-    in the tool results. This function parses the response to find all file IDs.
+    Entries expire after ``ttl`` seconds and the least recently used entry
+    is evicted once ``max_entries`` is reached. When ``path`` is given the
+    cache is loaded from that JSON file on creation and written back by
+    save(), so metadata survives between runs.
+
+    Example:
+        >>> cache = MetadataCache(ttl=600, path=".cache/file_metadata.json")
+        >>> set_metadata_cache(cache)
+        >>> results = download_all_files(client, response)  # fills the cache
+        >>> info = get_file_info(client, file_ids[0])       # no API call
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 3600,
+        path: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()  # file_id -> (stored_at, info)
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """Return cached metadata for file_id, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(file_id)
+            if entry is None:
+                return None
+            stored_at, info = entry
+            if self._expired(stored_at):
+                del self._entries[file_id]
+                return None
+            self._entries.move_to_end(file_id)
+            return dict(info)
+
+    def set(self, file_id: str, info: Dict[str, Any]) -> None:
+        """Store metadata for file_id, evicting the oldest entries if full."""
+        with self._lock:
+            self._entries[file_id] = (time.time(), dict(info))
+            self._entries.move_to_end(file_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self) -> None:
+        """Write unexpired entries to ``path`` (no-op for in-memory caches)."""
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                file_id: {'stored_at': stored_at, 'info': _serialize_info(info)}
+                for file_id, (stored_at, info) in self._entries.items()
+                if not self._expired(stored_at)
+            }
+        save_json(self.path, data)
+
+    def _load(self) -> None:
+        data = load_json(self.path, "metadata cache")
+        if data is None:
+            return
+
+        # Oldest first, so the LRU order matches the original store order
+        for file_id, entry in sorted(data.items(), key=lambda kv: kv[1]['stored_at']):
+            if not self._expired(entry['stored_at']):
+                self._entries[file_id] = (entry['stored_at'], _deserialize_info(entry['info']))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _serialize_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert metadata to JSON-safe values (datetimes become ISO strings)."""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in info.items()
+    }
+
+
+def _deserialize_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of _serialize_info()."""
+    info = dict(info)
+    if isinstance(info.get('created_at'), str):
+        try:
+            info['created_at'] = datetime.fromisoformat(info['created_at'])
+        except ValueError:
+            pass
+    return info
+
+
+_metadata_cache = MetadataCache()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Return the metadata cache shared by the functions in this module."""
+    return _metadata_cache
+
+
+def set_metadata_cache(cache: MetadataCache) -> None:
+    """Replace the shared metadata cache, e.g. with a persistent one."""
+    global _metadata_cache
+    _metadata_cache = cache
+
+
+def _file_info_to_dict(file_info) -> Dict[str, Any]:
+    """Convert a Files API metadata object to the dict used by get_file_info()."""
+    return {
+        'file_id': file_info.id,
+        'filename': file_info.filename,
+        'size': file_info.size_bytes,
+        'mime_type': file_info.mime_type,
+        'created_at': file_info.created_at,
+        'type': file_info.type,
+        'downloadable': file_info.downloadable
+    }
+
+
+def _lookup_metadata(
+    client: Anthropic,
+    file_id: str,
+    cache: Optional[MetadataCache] = None
+) -> Dict[str, Any]:
+    """
+    Return metadata for file_id, from the cache when possible.
+
+    Raises whatever the Files API raises on a cache miss that fails.
+    """
+    cache = cache if cache is not None else _metadata_cache
+    info = cache.get(file_id)
+    if info is None:
+        file_info = client.beta.files.retrieve_metadata(file_id=file_id)
+        info = _file_info_to_dict(file_info)
+        cache.set(file_id, info)
+    return info
+
+
+def _split_cached(cache: MetadataCache, file_ids: List[str]):
+    """Return (metadata found in the cache by file_id, set of missing file IDs)."""
+    resolved = {}
+    missing = set()
+    for file_id in file_ids:
+        info = cache.get(file_id)
+        if info is None:
+            missing.add(file_id)
+        else:
+            resolved[file_id] = info
+    return resolved, missing
+
+
+def _default_max_pages(missing: set, page_size: int) -> int:
+    """Enough list pages for all missing IDs, plus one (newest files come first)."""
+    return len(missing) // page_size + 2
+
+
+def _index_page(page, cache: MetadataCache, missing: set, resolved: Dict, pages: int, max_pages: int) -> bool:
+    """
+    Cache every file on a list page and move found IDs from missing to resolved.
+
+    Returns True when the next page should be fetched.
+    """
+    for file_info in page.data:
+        info = _file_info_to_dict(file_info)
+        cache.set(info['file_id'], info)
+        if info['file_id'] in missing:
+            missing.discard(info['file_id'])
+            resolved[info['file_id']] = info
+    return bool(missing) and pages < max_pages and page.has_next_page()
+
+
+def prefetch_metadata(
+    client: Anthropic,
+    file_ids: List[str],
+    cache: Optional[MetadataCache] = None,
+    page_size: int = DEFAULT_LIST_PAGE_SIZE,
+    max_pages: Optional[int] = None,
+    fallback: bool = True
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Resolve metadata for many file IDs with a few Files API list calls.
+
+    Pages through client.beta.files.list() (newest files first), indexing
+    every file seen into the metadata cache, and stops as soon as all
+    requested IDs are found or max_pages is reached. IDs that are still
+    missing afterwards are looked up individually unless fallback is False.
 
     Args:
-        response: The response object from client.beta.messages.create()
+        client: Anthropic client instance
+        file_ids: File IDs to resolve
+        cache: Metadata cache to fill (default: the shared module cache)
+        page_size: Files requested per list call (default: 100)
+        max_pages: Maximum list calls to make. Defaults to enough pages for
+            all missing IDs plus one, since freshly generated files are
+            listed first.
+        fallback: Whether to look up unlisted IDs one by one (default: True)
 
     Returns:
-        List of file IDs found in the response
+        Dictionary mapping each resolvable file_id to its metadata
 
     Example:
-        >>> response = client.beta.messages.create(...)
-        >>> file_ids = extract_file_ids(response)
-        >>> print(f"Found {len(file_ids)} files")
+        >>> metadata = prefetch_metadata(client, extract_file_ids(response))
+        >>> for file_id, info in metadata.items():
+        ...     print(f"{file_id}: {info['filename']}")
     """
-    file_ids = []
+    cache = cache if cache is not None else _metadata_cache
+    resolved, missing = _split_cached(cache, file_ids)
+
+    if missing:
+        if max_pages is None:
+            max_pages = _default_max_pages(missing, page_size)
+        try:
+            page = client.beta.files.list(limit=page_size)
+            pages = 1
+            while _index_page(page, cache, missing, resolved, pages, max_pages):
+                page = page.get_next_page()
+                pages += 1
+        except Exception as e:
+            print(f"Warning: Could not list files, falling back to per-file lookups: {e}")
+
+    # Fall back to per-ID lookups for anything the listing did not cover
+    for file_id in file_ids:
+        if fallback and file_id in missing:
+            try:
+                resolved[file_id] = _lookup_metadata(client, file_id, cache)
+            except Exception:
+                pass
+
+    return resolved
+
+
+# Matches file_id=abc, "file_id": "abc", 'file_id': 'abc' and similar
+_FILE_ID_PATTERN = re.compile(r"file_id['\"]?\s*[:=]\s*['\"]?([a-zA-Z0-9_-]+)")
+
+# Output that could be a JSON object or array (checked without stripping a copy)
+_JSON_START = re.compile(r"\s*[\[{]")
+
+
+class FileIdExtractor:
+    """
+    Incremental, single-pass file ID extractor.
+
+    Feed it content blocks from a finished response or events from a
+    message stream; it keeps the unique file IDs in discovery order. Each
+    feed call returns only the IDs that were new, so streaming callers can
+    start work on a file as soon as it is reported.
+
+    Example:
+        >>> extractor = FileIdExtractor()
+        >>> with client.beta.messages.stream(...) as stream:
+        ...     for event in stream:
+        ...         for file_id in extractor.feed_event(event):
+        ...             print(f"New file: {file_id}")
+        >>> print(extractor.file_ids)
+    """
+
+    def __init__(self):
+        self.file_ids: List[str] = []
+        self._seen = set()
+
+    def _add(self, file_id: str, new_ids: List[str]) -> None:
+        if file_id not in self._seen:
+            self._seen.add(file_id)
+            self.file_ids.append(file_id)
+            new_ids.append(file_id)
+
+    def feed_block(self, block) -> List[str]:
+        """Process one content block and return the file IDs it added."""
+        new_ids = []
+        block_type = getattr(block, 'type', None)
 
-    for block in response.content:
         # Check for bash_code_execution_tool_result (beta API format)
-        if block.type == "bash_code_execution_tool_result":
+        if block_type == "bash_code_execution_tool_result":
             try:
-                if hasattr(block, 'content') and hasattr(block.content, 'content'):
-                    # Iterate through content array
-                    for item in block.content.content:
-                        if hasattr(item, 'file_id'):
-                            file_ids.append(item.file_id)
+                content = getattr(block, 'content', None)
+                # Iterate through content array
+                for item in getattr(content, 'content', None) or ():
+                    file_id = getattr(item, 'file_id', None)
+                    if file_id is not None:
+                        self._add(file_id, new_ids)
             except Exception as e:
                 print(f"Warning: Error parsing bash_code_execution_tool_result: {e}")
-                continue
 
         # Check for legacy tool_result blocks (for backward compatibility)
-        elif block.type == "tool_result":
+        elif block_type == "tool_result":
             try:
                 if hasattr(block, 'output'):
-                    output_str = str(block.output)
-
-                    # Look for file_id patterns in the output
-                    if 'file_id' in output_str.lower():
-                        # Try to parse as JSON first
-                        try:
-                            output_json = json.loads(output_str)
-                            if isinstance(output_json, dict) and 'file_id' in output_json:
-                                file_ids.append(output_json['file_id'])
-                            elif isinstance(output_json, list):
-                                for item in output_json:
-                                    if isinstance(item, dict) and 'file_id' in item:
-                                        file_ids.append(item['file_id'])
-                        except json.JSONDecodeError:
-                            # If not JSON, use regex to find file_id patterns
-                            import re
-                            pattern = r"file_id['\"]?\s*[:=]\s*['\"]?([a-zA-Z0-9_-]+)"
-                            matches = re.findall(pattern, output_str)
-                            file_ids.extend(matches)
+                    self._scan_output(block.output, new_ids)
             except Exception as e:
                 print(f"Warning: Error parsing tool_result block: {e}")
-                continue
 
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_file_ids = []
-    for fid in file_ids:
-        if fid not in seen:
-            seen.add(fid)
-            unique_file_ids.append(fid)
+        return new_ids
+
+    def _scan_output(self, output, new_ids: List[str]) -> None:
+        output_str = output if isinstance(output, str) else str(output)
+
+        # Only the exact key can produce a match, so skip everything else
+        first = output_str.find('file_id')
+        if first < 0:
+            return
+
+        # Try to parse as JSON first
+        if _JSON_START.match(output_str):
+            try:
+                output_json = json.loads(output_str)
+            except json.JSONDecodeError:
+                pass
+            else:
+                if isinstance(output_json, dict) and 'file_id' in output_json:
+                    self._add(output_json['file_id'], new_ids)
+                elif isinstance(output_json, list):
+                    for item in output_json:
+                        if isinstance(item, dict) and 'file_id' in item:
+                            self._add(item['file_id'], new_ids)
+                return
+
+        # If not JSON, use regex to find file_id patterns
+        for match in _FILE_ID_PATTERN.finditer(output_str, first):
+            self._add(match.group(1), new_ids)
+
+    def feed_blocks(self, blocks) -> List[str]:
+        """Process a sequence of content blocks and return the new file IDs."""
+        new_ids = []
+        for block in blocks:
+            new_ids.extend(self.feed_block(block))
+        return new_ids
+
+    def feed_event(self, event) -> List[str]:
+        """
+        Process one message stream event and return the new file IDs.
+
+        Tool result blocks arrive complete in content_block_start events;
+        content_block_stop events from the SDK stream helper also carry the
+        finished block. Other event types are ignored.
+        """
+        event_type = getattr(event, 'type', None)
+        if event_type in ("content_block_start", "content_block_stop"):
+            block = getattr(event, 'content_block', None)
+            if block is not None:
+                return self.feed_block(block)
+        return []
 
-    return unique_file_ids
+
+def extract_file_ids(response) -> List[str]:
+    """
+    Extract all file IDs from a Claude API response.
+
+    Skills create files during code execution and return file_id attributes
+    in the tool results. This function parses the response to find all file IDs.
+    Use FileIdExtractor directly to extract IDs while a response streams.
+
+    Args:
+        response: The response object from client.beta.messages.create()
+
+    Returns:
+        List of unique file IDs found in the response, in order of appearance
+
+    Example:
+        >>> response = client.beta.messages.create(...)
+        >>> file_ids = extract_file_ids(response)
+        >>> print(f"Found {len(file_ids)} files")
+    """
+    extractor = FileIdExtractor()
+    extractor.feed_blocks(response.content)
+    return extractor.file_ids
+
+
+def _partial_path(output_path: str, file_id: str) -> str:
+    """Return the hidden path used to collect a download before it completes."""
+    directory, name = os.path.split(output_path)
+    return os.path.join(directory, f".{name}.{file_id}.part")
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Retry connection problems and transient HTTP statuses only.
+
+    Client errors and local failures (a full disk, a permission error, an
+    exception raised by progress_callback) are not retried.
+    """
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    # APIConnectionError includes APITimeoutError
+    return isinstance(error, (APIConnectionError,) + _TRANSPORT_ERRORS)
+
+
+def _backoff_delay(attempt: int, backoff_base: float, backoff_max: float) -> float:
+    """Exponential backoff with full jitter for the given (1-based) attempt."""
+    return random.uniform(0, min(backoff_max, backoff_base * (2 ** (attempt - 1))))
+
+
+def _hash_existing(path: str, hasher, chunk_size: int) -> None:
+    """Feed the bytes already downloaded to path into hasher."""
+    with open(path, 'rb') as existing:
+        for chunk in iter(lambda: existing.read(chunk_size), b''):
+            hasher.update(chunk)
+
+
+def _partial_size(part_path: str) -> int:
+    """Return the number of bytes already downloaded to part_path."""
+    return os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+
+def _range_headers(offset: int) -> Optional[Dict[str, str]]:
+    """Headers requesting the rest of a file from offset, if anything was downloaded."""
+    return {"Range": f"bytes={offset}-"} if offset else None
+
+
+def _remove_partial(part_path: str) -> None:
+    try:
+        os.remove(part_path)
+    except FileNotFoundError:
+        pass
+
+
+class _Attempt:
+    """
+    Bookkeeping for one download attempt.
+
+    Shared by file_utils and async_file_utils, so that the callers only do
+    the I/O: the request, reading chunks and writing them to the .part file.
+    Call load_partial() once, then check() before and record() after
+    writing each chunk, and finish() at the end, all inside validating().
+    """
+
+    def __init__(
+        self,
+        result: Dict[str, Any],
+        started: float,
+        offset: int,
+        status_code: int,
+        want_hash: bool,
+        validate_as: Optional[str],
+        progress_callback: Optional[ProgressCallback]
+    ):
+        if offset and status_code != 206:
+            # Transport ignored the range request, start over
+            offset = 0
+        self.result = result
+        self.started = started
+        self.offset = offset
+        self.written = offset
+        self.mode = 'ab' if offset else 'wb'
+        self.hasher = hashlib.sha256() if want_hash else None
+        self.validator = validator_for(validate_as) if validate_as else None
+        self.progress_callback = progress_callback
+
+    @contextmanager
+    def validating(self):
+        """Record the validation outcome and the time spent validating."""
+        try:
+            yield
+        except ArtifactValidationError:
+            self.result['validation'] = "invalid"
+            raise
+        finally:
+            if self.validator is not None:
+                self.result['validation_time'] += self.validator.elapsed
+
+    def load_partial(self, part_path: str, chunk_size: int) -> None:
+        """Feed the bytes kept from earlier attempts to the hash and validator (blocking)."""
+        if not self.offset:
+            return
+        if self.hasher is not None:
+            _hash_existing(part_path, self.hasher, chunk_size)
+        if self.validator is not None:
+            self.validator.seed(part_path)
+
+    def check(self, chunk: bytes) -> None:
+        """Called before a chunk is written; raises ArtifactValidationError on bad data."""
+        if self.result['ttfb'] is None:
+            self.result['ttfb'] = time.perf_counter() - self.started
+        if self.validator is not None:
+            self.validator.feed(chunk)
+
+    def record(self, chunk: bytes) -> None:
+        """Called after a chunk is written."""
+        if self.hasher is not None:
+            self.hasher.update(chunk)
+        self.written += len(chunk)
+        if self.progress_callback:
+            self.progress_callback(len(chunk), self.written)
+
+    def finish(self):
+        """Run the end-of-file checks; returns (total_bytes, resumed_bytes, sha256 or None)."""
+        if self.validator is not None:
+            self.validator.finish()
+            self.result['validation'] = "valid"
+        return self.written, self.offset, self.hasher.hexdigest() if self.hasher is not None else None
+
+
+def _start_attempts(result: Dict[str, Any]) -> None:
+    result['attempts'] = 0
+    result['resumed_bytes'] = 0
+
+
+def _retry_delay(
+    error: Exception,
+    result: Dict[str, Any],
+    part_path: str,
+    max_retries: int,
+    backoff_base: float,
+    backoff_max: float
+) -> Optional[float]:
+    """
+    Decide what follows a failed attempt.
+
+    Returns the seconds to wait before retrying, or None when error should
+    be raised. A corrupt document's .part file is removed, since resuming
+    it would keep the bad bytes, and so is one the server no longer
+    accepts a range for (416).
+    """
+    if isinstance(error, ArtifactValidationError):
+        _remove_partial(part_path)
+        return None
+    if isinstance(error, APIStatusError) and error.status_code == 416:
+        # Partial file no longer matches the remote file, start over
+        _remove_partial(part_path)
+    elif not _is_retryable(error):
+        return None
+    if result['attempts'] > max_retries:
+        return None
+    return _backoff_delay(result['attempts'], backoff_base, backoff_max)
+
+
+def _stream_attempt(
+    client: Anthropic,
+    file_id: str,
+    part_path: str,
+    chunk_size: int,
+    progress_callback: Optional[ProgressCallback],
+    want_hash: bool,
+    result: Dict[str, Any],
+    started: float,
+    validate_as: Optional[str] = None
+):
+    """
+    Make one download attempt, appending to part_path.
+
+    Bytes already in part_path are requested with a Range header and kept
+    if the server answers 206; otherwise the download restarts from zero.
+    The first chunk received sets result['ttfb'] relative to started.
+    When validate_as names a checked file type (see artifact_validation),
+    the bytes are validated as they arrive and the outcome and time spent
+    are recorded in result.
+
+    Returns:
+        (total_bytes, resumed_bytes, sha256 hex digest or None)
+    """
+    offset = _partial_size(part_path)
+    with client.beta.files.with_streaming_response.download(
+        file_id=file_id, extra_headers=_range_headers(offset)
+    ) as response:
+        attempt = _Attempt(
+            result, started, offset, response.status_code, want_hash, validate_as, progress_callback
+        )
+        with attempt.validating():
+            attempt.load_partial(part_path, chunk_size)
+            with open(part_path, attempt.mode) as f:
+                for chunk in response.iter_bytes(chunk_size):
+                    attempt.check(chunk)
+                    f.write(chunk)
+                    attempt.record(chunk)
+            return attempt.finish()
+
+
+def _stream_to_file(
+    client: Anthropic,
+    file_id: str,
+    output_path: str,
+    chunk_size: int,
+    progress_callback: Optional[ProgressCallback],
+    result: Dict[str, Any],
+    started: float,
+    want_hash: bool = False,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_base: float = DEFAULT_BACKOFF_BASE,
+    backoff_max: float = DEFAULT_BACKOFF_MAX,
+    validate: bool = True
+) -> Optional[str]:
+    """
+    Stream a file from the Files API into output_path, chunk by chunk.
+
+    Data is collected in a hidden .part file in the destination directory
+    and moved into place with os.replace() once complete, so readers never
+    see a partially written file. Failed attempts are retried with
+    exponential backoff and resume from the bytes already on disk; the
+    .part file is kept on final failure so the next run can resume too.
+
+    The number of attempts, bytes resumed, final size and time to first
+    byte (measured from started, a time.perf_counter() value) are recorded
+    in result. Returns the sha256 digest when want_hash is True.
+
+    With validate, documents are checked while they stream; a corrupt file
+    raises ArtifactValidationError without retrying and its .part file is
+    removed, since resuming it would keep the bad bytes.
+
+    Requests are sent with the SDK's own retries disabled, so a persistent
+    server error costs max_retries + 1 requests rather than that number
+    multiplied by the client's max_retries.
+    """
+    part_path = _partial_path(output_path, file_id)
+    client = client.with_options(max_retries=0)
+    _start_attempts(result)
+
+    while True:
+        result['attempts'] += 1
+        try:
+            written, resumed, digest = _stream_attempt(
+                client, file_id, part_path, chunk_size, progress_callback, want_hash,
+                result, started, validate_as=output_path if validate else None
+            )
+            break
+        except Exception as e:
+            delay = _retry_delay(e, result, part_path, max_retries, backoff_base, backoff_max)
+            if delay is None:
+                raise
+            time.sleep(delay)
+
+    os.replace(part_path, output_path)
+    result['resumed_bytes'] = resumed
+    result['size'] = written
+    return digest
+
+
+def _prepare_output(result: Dict[str, Any], output_path: str, overwrite: bool) -> Optional[bool]:
+    """
+    Check output_path and create its directory (blocking).
+
+    Returns whether the file already exists, or None (with result['error']
+    set) when it exists and overwrite is False.
+    """
+    file_exists = os.path.exists(output_path)
+    if file_exists and not overwrite:
+        result['error'] = f"File already exists: {output_path} (set overwrite=True to replace)"
+        return None
+
+    # Create output directory if it doesn't exist
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+    return file_exists
+
+
+def _use_stored(
+    result: Dict[str, Any],
+    store: Optional[ArtifactStore],
+    file_id: str,
+    output_path: str,
+    file_exists: bool
+) -> bool:
+    """Place stored content at output_path if the store has it (blocking); True if it did."""
+    entry = store.materialize(file_id, output_path) if store is not None else None
+    if entry is None:
+        return False
+    result['size'] = entry['size']
+    result['sha256'] = entry['sha256']
+    result['from_store'] = True
+    result['success'] = True
+    result['overwritten'] = file_exists
+    return True
+
+
+def _record_download(
+    result: Dict[str, Any],
+    store: Optional[ArtifactStore],
+    file_id: str,
+    output_path: str,
+    digest: Optional[str],
+    filename: Optional[str],
+    file_exists: bool
+) -> None:
+    """Mark a streamed download as done and add it to the store (blocking)."""
+    if store is not None:
+        result['sha256'] = digest
+        store.add(file_id, output_path, result['sha256'], result['size'], filename)
+    result['success'] = True
+    result['overwritten'] = file_exists  # Track if we overwrote an existing file
 
 
 def download_file(
     client: Anthropic,
     file_id: str,
     output_path: str,
-    overwrite: bool = True
+    overwrite: bool = True,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress_callback: Optional[ProgressCallback] = None,
+    store: Optional[ArtifactStore] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_base: float = DEFAULT_BACKOFF_BASE,
+    backoff_max: float = DEFAULT_BACKOFF_MAX,
+    metrics_callback: Optional[MetricsCallback] = None,
+    validate: bool = True,
+    filename: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Download a file from Claude's Files API and save it locally.
 
+    The file is streamed to disk in chunks, so memory use does not grow
+    with file size, and is atomically renamed into place when complete.
+    Transient failures are retried with exponential backoff and jitter,
+    resuming from the bytes already on disk when the server supports
+    ranged reads (including partial downloads left by an earlier run).
+    When an ArtifactStore is given, file IDs already in its manifest are
+    linked from the store without any network access, and new downloads
+    are recorded in it. PDF and Office (xlsx/docx/pptx) files are checked
+    for structural damage while they stream; a corrupt file fails the
+    download as soon as it is detected and is not saved.
+
     Args:
         client: Anthropic client instance
         file_id: The file ID returned by Skills
         output_path: Local path where the file should be saved
         overwrite: Whether to overwrite existing files (default: True)
+        chunk_size: Number of bytes read per chunk (default: 64 KB)
+        progress_callback: Optional callable invoked after each chunk with
+            (bytes_in_chunk, total_bytes_written)
+        store: Optional ArtifactStore used to skip and record downloads
+        max_retries: Retries after the first failed attempt (default: 3)
+        backoff_base: Initial backoff in seconds, doubled per retry (default: 0.5)
+        backoff_max: Upper bound for a single backoff in seconds (default: 8.0)
+        metrics_callback: Optional callable that receives the result dict
+            when the download finishes, e.g. to export timings
+        validate: Check document structure while streaming (default: True)
+        filename: The file's name without any prefix, recorded in the
+            store manifest (default: the basename of output_path)
 
     Returns:
         Dictionary with download metadata:
@@ -107,7 +811,17 @@ def download_file(
             'output_path': str,
             'size': int,
             'success': bool,
-            'error': Optional[str]
+            'error': Optional[str],
+            'from_store': bool,
+            'sha256': Optional[str],       # content digest, set when a store is used
+            'attempts': int,
+            'resumed_bytes': int,
+            'started_at': float,           # time.perf_counter() when the call began
+            'wall_time': float,            # seconds
+            'ttfb': Optional[float],       # seconds to first byte received
+            'throughput': Optional[float], # bytes transferred per second
+            'validation': Optional[str],   # 'valid', 'invalid' or None if not checked
+            'validation_time': float       # seconds spent validating
         }
 
     Example:
@@ -118,42 +832,165 @@ def download_file(
         ...         print(f"Overwrote existing file: {result['output_path']}")
         ...     print(f"Downloaded {result['size']} bytes to {result['output_path']}")
     """
-    result = {
+    result = _new_result(file_id, output_path)
+    started = time.perf_counter()
+
+    try:
+        file_exists = _prepare_output(result, output_path, overwrite)
+        if file_exists is None:
+            return _finish_download(result, started, metrics_callback)
+
+        # Reuse content we already have instead of downloading it again
+        if _use_stored(result, store, file_id, output_path, file_exists):
+            return _finish_download(result, started, metrics_callback)
+
+        # Stream file content from Files API (beta namespace) to disk
+        digest = _stream_to_file(
+            client, file_id, output_path, chunk_size, progress_callback, result, started,
+            want_hash=store is not None,
+            max_retries=max_retries,
+            backoff_base=backoff_base,
+            backoff_max=backoff_max,
+            validate=validate
+        )
+        _record_download(result, store, file_id, output_path, digest, filename, file_exists)
+
+    except Exception as e:
+        result['error'] = str(e)
+
+    return _finish_download(result, started, metrics_callback)
+
+
+def _new_result(file_id: str, output_path: str) -> Dict[str, Any]:
+    """Return a fresh download result dict (see download_file() for the schema)."""
+    return {
         'file_id': file_id,
         'output_path': output_path,
         'size': 0,
         'success': False,
-        'error': None
+        'error': None,
+        'from_store': False,
+        'sha256': None,
+        'attempts': 0,
+        'resumed_bytes': 0,
+        'started_at': None,
+        'wall_time': 0.0,
+        'ttfb': None,
+        'throughput': None,
+        'validation': None,
+        'validation_time': 0.0
     }
 
-    try:
-        # Check if file exists
-        file_exists = os.path.exists(output_path)
-        if file_exists and not overwrite:
-            result['error'] = f"File already exists: {output_path} (set overwrite=True to replace)"
-            return result
 
-        # Create output directory if it doesn't exist
-        output_dir = os.path.dirname(output_path)
-        if output_dir:
-            Path(output_dir).mkdir(parents=True, exist_ok=True)
+def _finish_download(
+    result: Dict[str, Any],
+    started: float,
+    metrics_callback: Optional[MetricsCallback]
+) -> Dict[str, Any]:
+    """Record timing figures in result and hand it to the metrics callback."""
+    result['started_at'] = started
+    result['wall_time'] = time.perf_counter() - started
+    transferred = result['size'] - result['resumed_bytes']
+    if result['success'] and not result['from_store'] and result['wall_time'] > 0:
+        result['throughput'] = transferred / result['wall_time']
 
-        # Download file content from Files API (beta namespace)
-        file_content = client.beta.files.download(file_id=file_id)
+    if metrics_callback:
+        try:
+            metrics_callback(result)
+        except Exception as e:
+            # Metrics export must never fail a download
+            print(f"Warning: metrics callback failed: {e}")
 
-        # Save to disk
-        with open(output_path, 'wb') as f:
-            f.write(file_content.read())
+    return result
 
-        # Get file size
-        result['size'] = os.path.getsize(output_path)
-        result['success'] = True
-        result['overwritten'] = file_exists  # Track if we overwrote an existing file
 
-    except Exception as e:
-        result['error'] = str(e)
+def _stored_filename(store: Optional[ArtifactStore], file_id: str) -> Optional[str]:
+    """
+    Return the filename recorded for a stored file, or None if not stored.
 
-    return result
+    The name comes from the store manifest, so no metadata request is
+    needed. It never includes a prefix; callers add the current one.
+    """
+    entry = store.get(file_id) if store is not None else None
+    return entry.get('filename') if entry is not None else None
+
+
+class OutputPaths:
+    """
+    Hands out distinct output paths for one batch of downloads.
+
+    Two file IDs can have the same filename; the second one claimed gets
+    "report (2).txt", the third "report (3).txt" and so on, so concurrent
+    downloads never replace each other's files.
+    """
+
+    def __init__(self):
+        self._claimed = set()
+        self._lock = threading.Lock()
+
+    def claim(self, path: str) -> str:
+        """Return path, or a numbered variant if it was already claimed."""
+        root, extension = os.path.splitext(path)
+        with self._lock:
+            candidate = path
+            number = 2
+            while candidate in self._claimed:
+                candidate = f"{root} ({number}){extension}"
+                number += 1
+            self._claimed.add(candidate)
+        return candidate
+
+
+def _resolve_filename(
+    client: Anthropic,
+    index: int,
+    file_id: str,
+    cache: Optional[MetadataCache],
+    store: Optional[ArtifactStore]
+) -> str:
+    """
+    Return the filename for one file ID, without a prefix.
+
+    Files already in the store keep the name recorded for them, so no
+    metadata request is made for them.
+    """
+    filename = _stored_filename(store, file_id)
+    if filename is None:
+        # Try to get file metadata for proper filename
+        try:
+            filename = _lookup_metadata(client, file_id, cache)['filename']
+        except Exception:
+            # If we can't get metadata, use a generic filename
+            filename = f"file_{index}.bin"
+    return filename
+
+
+def _download_indexed_file(
+    client: Anthropic,
+    index: int,
+    file_id: str,
+    output_dir: str,
+    prefix: str,
+    overwrite: bool,
+    cache: Optional[MetadataCache],
+    store: Optional[ArtifactStore],
+    metrics_callback: Optional[MetricsCallback],
+    paths: OutputPaths
+) -> Dict[str, Any]:
+    """
+    Resolve the output path for one file ID and download it.
+
+    The metadata lookup and the download run back to back so that a worker
+    thread can overlap both round trips with those of other files. Used
+    when files are discovered one at a time (see skill_stream), so paths
+    shared with earlier files are numbered in the order they resolve.
+    """
+    filename = _resolve_filename(client, index, file_id, cache, store)
+    output_path = paths.claim(os.path.join(output_dir, f"{prefix}{filename}"))
+    return download_file(
+        client, file_id, output_path, overwrite=overwrite, store=store,
+        metrics_callback=metrics_callback, filename=filename
+    )
 
 
 def download_all_files(
@@ -161,13 +998,27 @@ def download_all_files(
     response,
     output_dir: str = "outputs",
     prefix: str = "",
-    overwrite: bool = True
+    overwrite: bool = True,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    cache: Optional[MetadataCache] = None,
+    store: Optional[ArtifactStore] = None,
+    bulk_metadata_threshold: int = DEFAULT_BULK_METADATA_THRESHOLD,
+    metrics_callback: Optional[MetricsCallback] = None
 ) -> List[Dict[str, Any]]:
     """
     Extract and download all files from a Claude API response.
 
     This is a convenience function that combines extract_file_ids()
     and download_file() to download all files in a single call.
+    Metadata lookups and downloads for different files run concurrently
+    on a bounded thread pool; results are still returned in the order
+    reported by extract_file_ids(). Filenames are resolved before any
+    download starts, so files sharing a name get distinct paths
+    ("report.txt", "report (2).txt") in that order. The metadata fetched
+    for each file is stored in the metadata cache so later get_file_info()
+    calls are free.
+    When many file IDs are not cached yet, their metadata is resolved in
+    bulk with prefetch_metadata() instead of one request per file.
 
     Args:
         client: Anthropic client instance
@@ -175,6 +1026,13 @@ def download_all_files(
         output_dir: Directory where files should be saved
         prefix: Optional prefix for filenames (e.g., "financial_report_")
         overwrite: Whether to overwrite existing files (default: True)
+        max_workers: Maximum number of files fetched in parallel
+            (default: DEFAULT_MAX_WORKERS, use 1 for serial downloads)
+        cache: Metadata cache to use (default: the shared module cache)
+        store: Optional ArtifactStore; files already stored are not downloaded
+        bulk_metadata_threshold: Minimum number of uncached file IDs for which
+            metadata is prefetched by listing files (default: 5, 0 disables)
+        metrics_callback: Optional callable that receives each result dict
 
     Returns:
         List of download results (one per file)
@@ -188,39 +1046,74 @@ def download_all_files(
         ...     else:
         ...         print(f"✗ Failed: {result['error']}")
     """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+    cache = cache if cache is not None else _metadata_cache
     file_ids = extract_file_ids(response)
-    results = []
 
-    for i, file_id in enumerate(file_ids, 1):
-        # Try to get file metadata for proper filename
-        try:
-            file_info = client.beta.files.retrieve_metadata(file_id=file_id)
-            filename = file_info.filename
-        except Exception:
-            # If we can't get metadata, use a generic filename
-            filename = f"file_{i}.bin"
+    if bulk_metadata_threshold > 0:
+        uncached = [
+            file_id for file_id in file_ids
+            if cache.get(file_id) is None and _stored_filename(store, file_id) is None
+        ]
+        if len(uncached) >= bulk_metadata_threshold:
+            # Misses are looked up concurrently by the download workers
+            prefetch_metadata(client, uncached, cache, fallback=False)
+
+    def resolve(indexed):
+        index, file_id = indexed
+        return _resolve_filename(client, index, file_id, cache, store)
 
-        # Add prefix if provided
-        if prefix:
-            filename = f"{prefix}{filename}"
+    def fetch(item):
+        file_id, filename, output_path = item
+        return download_file(
+            client, file_id, output_path, overwrite=overwrite, store=store,
+            metrics_callback=metrics_callback, filename=filename
+        )
 
-        # Construct full output path
-        output_path = os.path.join(output_dir, filename)
+    def plan(filenames):
+        # Repeated names are numbered in file order whatever the timing
+        paths = OutputPaths()
+        return [
+            (file_id, filename, paths.claim(os.path.join(output_dir, f"{prefix}{filename}")))
+            for file_id, filename in zip(file_ids, filenames)
+        ]
 
-        # Download the file
-        result = download_file(client, file_id, output_path, overwrite=overwrite)
-        results.append(result)
+    # Serial path avoids thread start-up cost for the common single-file case
+    if max_workers == 1 or len(file_ids) <= 1:
+        downloads = plan([resolve(item) for item in enumerate(file_ids, 1)])
+        results = [fetch(item) for item in downloads]
+    else:
+        workers = min(max_workers, len(file_ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # executor.map yields results in submission order
+            downloads = plan(list(executor.map(resolve, enumerate(file_ids, 1))))
+            results = list(executor.map(fetch, downloads))
+
+    try:
+        cache.save()
+    except OSError as e:
+        print(f"Warning: Could not save metadata cache: {e}")
 
     return results
 
 
-def get_file_info(client: Anthropic, file_id: str) -> Optional[Dict[str, Any]]:
+def get_file_info(
+    client: Anthropic,
+    file_id: str,
+    cache: Optional[MetadataCache] = None
+) -> Optional[Dict[str, Any]]:
     """
     Retrieve metadata about a file from the Files API.
 
+    Results are served from the metadata cache when available, so calling
+    this after download_all_files() does not repeat the API request.
+
     Args:
         client: Anthropic client instance
         file_id: The file ID to query
+        cache: Metadata cache to use (default: the shared module cache)
 
     Returns:
         Dictionary with file metadata, or None if not found
@@ -233,21 +1126,28 @@ def get_file_info(client: Anthropic, file_id: str) -> Optional[Dict[str, Any]]:
         ...     print(f"Created: {info['created_at']}")
     """
     try:
-        file_info = client.beta.files.retrieve_metadata(file_id=file_id)
-        return {
-            'file_id': file_info.id,
-            'filename': file_info.filename,
-            'size': file_info.size_bytes,
-            'mime_type': file_info.mime_type,
-            'created_at': file_info.created_at,
-            'type': file_info.type,
-            'downloadable': file_info.downloadable
-        }
+        return _lookup_metadata(client, file_id, cache)
     except Exception as e:
         print(f"Error retrieving file info: {e}")
         return None
 
 
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of values.
+
+    Args:
+        values: Non-empty list of numbers
+        pct: Percentile between 0 and 100
+
+    Example:
+        >>> percentile([r['wall_time'] for r in results], 99)
+    """
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
 def print_download_summary(results: List[Dict[str, Any]]) -> None:
     """
     Print a formatted summary of file download results.
@@ -266,6 +1166,10 @@ def print_download_summary(results: List[Dict[str, Any]]) -> None:
         ✗ outputs/report.pdf - Error: File not found
 
         Total: 2/3 files downloaded successfully
+        Total size: 0.17 MB
+        Throughput: 4.12 MB/s (2 downloads in 0.04 s, 2.31 MB/s per file)
+        Latency: p50 21 ms, p90 23 ms, p99 23 ms (TTFB p50 9 ms)
+        Validation: 2/2 valid (0.3 ms total)
     """
     print("\nFile Download Summary")
     print("=" * 50)
@@ -277,7 +1181,8 @@ def print_download_summary(results: List[Dict[str, Any]]) -> None:
         if result['success']:
             size_kb = result['size'] / 1024
             overwrite_notice = " [overwritten]" if result.get('overwritten', False) else ""
-            print(f"✓ {result['output_path']} ({size_kb:.1f} KB){overwrite_notice}")
+            store_notice = " [from store]" if result.get('from_store', False) else ""
+            print(f"✓ {result['output_path']} ({size_kb:.1f} KB){overwrite_notice}{store_notice}")
             success_count += 1
             total_size += result['size']
         else:
@@ -287,3 +1192,37 @@ def print_download_summary(results: List[Dict[str, Any]]) -> None:
     if success_count > 0:
         total_mb = total_size / (1024 * 1024)
         print(f"Total size: {total_mb:.2f} MB")
+
+    # Timing figures only cover files actually fetched over the network
+    timed = [
+        r for r in results
+        if r['success'] and not r.get('from_store') and r.get('wall_time') is not None
+    ]
+    if timed:
+        transferred_mb = sum(r['size'] - r.get('resumed_bytes', 0) for r in timed) / (1024 * 1024)
+        # Downloads overlap, so the aggregate rate is over the time from the
+        # first start to the last finish, not the sum of per-file times
+        started = [r['started_at'] for r in timed if r.get('started_at') is not None]
+        if len(started) == len(timed):
+            span = max(r['started_at'] + r['wall_time'] for r in timed) - min(started)
+        else:
+            span = sum(r['wall_time'] for r in timed)
+        busy_time = sum(r['wall_time'] for r in timed)
+        if span > 0 and busy_time > 0:
+            print(f"Throughput: {transferred_mb / span:.2f} MB/s "
+                  f"({len(timed)} downloads in {span:.2f} s, "
+                  f"{transferred_mb / busy_time:.2f} MB/s per file)")
+        wall_times = [r['wall_time'] * 1000 for r in timed]
+        latency = (f"Latency: p50 {percentile(wall_times, 50):.0f} ms, "
+                   f"p90 {percentile(wall_times, 90):.0f} ms, "
+                   f"p99 {percentile(wall_times, 99):.0f} ms")
+        ttfbs = [r['ttfb'] * 1000 for r in timed if r.get('ttfb') is not None]
+        if ttfbs:
+            latency += f" (TTFB p50 {percentile(ttfbs, 50):.0f} ms)"
+        print(latency)
+
+    validated = [r for r in results if r.get('validation')]
+    if validated:
+        valid_count = sum(1 for r in validated if r['validation'] == "valid")
+        validation_ms = sum(r['validation_time'] for r in validated) * 1000
+        print(f"Validation: {valid_count}/{len(validated)} valid ({validation_ms:.1f} ms total)")
@@ -0,0 +1,77 @@
+"""
+Small helpers for the JSON files the scripts persist between runs
+(metadata cache, artifact manifest, skill catalog, batch state, skill
+indexes).
+
+- load_json(): read a file, treating a missing or unreadable one as absent
+- save_json(): replace a file atomically through a unique temporary file
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional, Any, TextIO
+
+# mkstemp creates files readable by the owner only; give saved files the
+# permissions a plain open() would have. Read once, as os.umask() can only
+# be read by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def load_json(path: str, description: str, stream: Optional[TextIO] = None) -> Optional[Any]:
+    """
+    Read a JSON file.
+
+    Args:
+        path: File to read
+        description: What the file is, for the warning (e.g. "skill catalog")
+        stream: Where to print the warning (default: stdout)
+
+    Returns:
+        The parsed data, or None if the file does not exist or cannot be
+        read or parsed (a warning is printed in the latter case)
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable {description} {path}: {e}", file=stream or sys.stdout)
+        return None
+
+
+def save_json(path: str, data: Any, **dump_kwargs) -> None:
+    """
+    Atomically replace path with data serialized as JSON.
+
+    The data is written to a uniquely named temporary file in the same
+    directory and renamed over path, so readers never see a partial file
+    and concurrent writers cannot clobber each other's temporary file.
+
+    Args:
+        path: File to write (parent directories are created)
+        data: JSON-serializable data
+        **dump_kwargs: Passed to json.dump (e.g. indent=2)
+    """
+    directory = os.path.dirname(path) or "."
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory,
+        prefix=f".{os.path.basename(path)}.",
+        suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            os.chmod(temp_path, 0o666 & ~_UMASK)
+            json.dump(data, f, **dump_kwargs)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
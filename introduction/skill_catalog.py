@@ -0,0 +1,170 @@
+"""
+Cached catalog of the skills available through the Skills API.
+
+Lists every page of client.beta.skills.list(), fetches version details
+concurrently and persists the result to a local JSON file. Within the TTL a
+listing makes no API calls at all; after it expires only the skill list is
+re-read, and version details are fetched again only for skill versions that
+are not cached yet (they are keyed by skill id and version).
+
+Example:
+    >>> catalog = SkillCatalog()
+    >>> for skill in catalog.list_skills():
+    ...     print(skill['skill_id'], skill['latest_version'], skill['name'])
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any
+
+from anthropic import Anthropic
+
+from anthropic_client_init import SKILLS_BETA, get_client
+from json_files import load_json, save_json
+
+DEFAULT_CATALOG_PATH = os.getenv("SKILL_CATALOG_CACHE", ".cache/skill_catalog.json")
+DEFAULT_CATALOG_TTL = 3600
+DEFAULT_PAGE_SIZE = 100
+
+
+def _version_key(skill_id: str, version: str) -> str:
+    return f"{skill_id}@{version}"
+
+
+class SkillCatalog:
+    """
+    Skill listing with a persistent, TTL-bound cache.
+
+    Args:
+        client: Anthropic client (default: the shared client)
+        path: JSON file the catalog is persisted to (None keeps it in memory)
+        ttl: Seconds a listing is reused without any API call
+        source: Skill source to list, e.g. "anthropic" or "custom"
+        max_workers: Maximum concurrent version detail requests
+    """
+
+    def __init__(
+        self,
+        client: Optional[Anthropic] = None,
+        path: Optional[str] = DEFAULT_CATALOG_PATH,
+        ttl: float = DEFAULT_CATALOG_TTL,
+        source: str = "anthropic",
+        max_workers: int = 8
+    ):
+        self._client = client
+        self.path = path
+        self.ttl = ttl
+        self.source = source
+        self.max_workers = max_workers
+        self.api_calls = 0
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    @property
+    def client(self) -> Anthropic:
+        if self._client is None:
+            self._client = get_client()
+        return self._client
+
+    def _load(self) -> Dict[str, Any]:
+        data = load_json(self.path, "skill catalog") if self.path else None
+        if data is None:
+            return {'sources': {}, 'versions': {}}
+        data.setdefault('sources', {})
+        data.setdefault('versions', {})
+        return data
+
+    def _save(self) -> None:
+        if self.path:
+            save_json(self.path, self._data, indent=2)
+
+    def _list_all(self) -> List[Dict[str, Any]]:
+        """Read every page of the skill listing."""
+        skills = []
+        page = self.client.beta.skills.list(
+            source=self.source, limit=DEFAULT_PAGE_SIZE, betas=[SKILLS_BETA]
+        )
+        self.api_calls += 1
+        while True:
+            for skill in page.data:
+                skills.append({
+                    'skill_id': skill.id,
+                    'display_title': skill.display_title,
+                    'latest_version': skill.latest_version,
+                    'created_at': str(skill.created_at)
+                })
+            if not page.has_next_page():
+                break
+            page = page.get_next_page()
+            self.api_calls += 1
+        return skills
+
+    def _fetch_version(self, skill: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self.api_calls += 1
+        try:
+            version_info = self.client.beta.skills.versions.retrieve(
+                skill_id=skill['skill_id'], version=skill['latest_version'], betas=[SKILLS_BETA]
+            )
+            return {'name': version_info.name, 'description': version_info.description}
+        except Exception as e:
+            return {'error': str(e)}
+
+    def list_skills(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Return all skills with their latest version details.
+
+        Args:
+            refresh: Ignore the TTL and re-read the skill listing
+
+        Returns:
+            List of dicts with skill_id, display_title, latest_version,
+            created_at, name and description. If version details could not
+            be fetched, 'error' is set instead of name/description.
+        """
+        listing = self._data['sources'].get(self.source)
+        fresh = listing is not None and time.time() - listing['listed_at'] <= self.ttl
+        changed = False
+
+        if refresh or not fresh:
+            listing = {'listed_at': time.time(), 'skills': self._list_all()}
+            self._data['sources'][self.source] = listing
+            changed = True
+
+        versions = self._data['versions']
+        errors = {}
+        missing = [
+            skill for skill in listing['skills']
+            if _version_key(skill['skill_id'], skill['latest_version']) not in versions
+        ]
+        if missing:
+            workers = max(1, min(self.max_workers, len(missing)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                details = list(executor.map(self._fetch_version, missing))
+            for skill, detail in zip(missing, details):
+                key = _version_key(skill['skill_id'], skill['latest_version'])
+                # Failed lookups are not cached so they are retried next time
+                if 'error' in detail:
+                    errors[key] = detail['error']
+                else:
+                    versions[key] = detail
+                    changed = True
+
+        if changed:
+            try:
+                self._save()
+            except OSError as e:
+                print(f"Warning: Could not save skill catalog: {e}")
+
+        results = []
+        for skill in listing['skills']:
+            entry = dict(skill)
+            key = _version_key(skill['skill_id'], skill['latest_version'])
+            if key in versions:
+                entry.update(versions[key])
+            else:
+                entry['error'] = errors.get(key, "version details unavailable")
+            results.append(entry)
+        return results
@@ -0,0 +1,69 @@
+"""
+Helpers for building Skills API requests.
+
+The per-format scripts spell their requests out inline for readability;
+tools that generate many requests (batch runs, fan-out) build them here so
+the container, tool and beta settings stay in one place.
+"""
+
+from typing import Optional, List, Dict, Any
+
+from anthropic_client_init import MODEL
+
+# Anthropic-managed document skills
+ALL_SKILLS = ["xlsx", "pptx", "pdf", "docx"]
+
+# Beta features needed for skills with code execution and file downloads
+SKILL_BETAS = ["code-execution-2025-08-25", "files-api-2025-04-14", "skills-2025-10-02"]
+
+CODE_EXECUTION_TOOL = {"type": "code_execution_20250825", "name": "code_execution"}
+
+# Prompt-cache breakpoint. The tools (and the skills loaded with them) are
+# the same on every request, so marking the tool caches that prefix.
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def build_skill_request(
+    prompt: str,
+    skills: Optional[List[str]] = None,
+    model: str = MODEL,
+    max_tokens: int = 4096,
+    container_id: Optional[str] = None,
+    cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Build the keyword arguments for client.beta.messages.create().
+
+    Args:
+        prompt: The user's request
+        skills: Anthropic skill IDs to attach (default: all document skills)
+        model: Model to use (default: ANTHROPIC_MODEL)
+        max_tokens: Maximum tokens to generate
+        container_id: Existing container to run in instead of a new one
+        cache: Place a prompt-cache breakpoint after the static tools prefix
+
+    Example:
+        >>> request = build_skill_request("Create a budget spreadsheet", ["xlsx"])
+        >>> response = client.beta.messages.create(**request)
+    """
+    container = {
+        'skills': [
+            {"type": "anthropic", "skill_id": skill_id, "version": "latest"}
+            for skill_id in (skills or ALL_SKILLS)
+        ]
+    }
+    if container_id:
+        container['id'] = container_id
+
+    tool = dict(CODE_EXECUTION_TOOL)
+    if cache:
+        tool['cache_control'] = CACHE_CONTROL
+
+    return {
+        'model': model,
+        'max_tokens': max_tokens,
+        'container': container,
+        'tools': [tool],
+        'messages': [{"role": "user", "content": prompt}],
+        'betas': list(SKILL_BETAS),
+    }
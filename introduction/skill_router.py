@@ -0,0 +1,159 @@
+"""
+Local routing of requests to the document skills they need.
+
+route_skills() scores a prompt against keyword lists for each format and
+picks the smallest skill set that clearly matches, so requests that only
+need one format do not pay for loading all four skills. Keywords are
+conclusive only when the best format leads the runner-up by a clear
+margin. Otherwise a small model can be asked (SKILL_ROUTER_MODEL), and
+without an answer from it every format with any keyword match is kept.
+When nothing matches at all, all skills are attached and the choice is
+left to Claude as before.
+
+Every decision is printed, and appended as a JSON line to SKILL_ROUTER_LOG
+when that environment variable is set.
+
+Example:
+    >>> decision = route_skills("Create a quarterly sales spreadsheet")
+    🧭 Skill router: xlsx (keywords, confidence 1.00)
+    >>> decision['skills']
+    ['xlsx']
+"""
+
+import json
+import os
+import re
+import time
+from typing import Optional, List, Dict, Any
+
+from anthropic import Anthropic
+
+from anthropic_client_init import get_client
+from skill_request import ALL_SKILLS
+
+# Small model asked when keywords are inconclusive (unset: no model fallback)
+ROUTER_MODEL = os.getenv("SKILL_ROUTER_MODEL")
+ROUTER_LOG = os.getenv("SKILL_ROUTER_LOG")
+
+# Keyword weights per skill. Format names count 3 and are enough on their
+# own; generic words count 1 and need support from a second match.
+SKILL_KEYWORDS = {
+    "xlsx": {
+        "xlsx": 3, "excel": 3, "spreadsheet": 3, "spreadsheets": 3, "workbook": 3,
+        "csv": 2, "pivot": 2, "formula": 2, "formulas": 2,
+        "table": 1, "budget": 1, "chart": 1, "columns": 1, "rows": 1, "calculate": 1,
+        "tracker": 1, "financial": 1, "data": 1,
+    },
+    "pptx": {
+        "pptx": 3, "powerpoint": 3, "presentation": 3, "slides": 3, "slide": 3,
+        "deck": 3, "slideshow": 3, "keynote": 2,
+        "pitch": 1, "talk": 1, "speaker": 1, "webinar": 1,
+    },
+    "pdf": {
+        "pdf": 3, "pdfs": 3, "fillable": 2, "form": 1,
+        "printable": 1, "brochure": 1, "flyer": 1, "certificate": 1, "invoice": 1,
+    },
+    "docx": {
+        "docx": 3, "word": 2, "letter": 2, "memo": 2, "resume": 2, "contract": 2, "essay": 2,
+        "proposal": 1, "report": 1, "document": 1, "article": 1, "cover": 1, "policy": 1,
+    },
+}
+
+# Confidence is the lead of the best format over the runner-up, where a
+# lead of CONFIDENT_MARGIN (one format name) counts as 1.0. A confident
+# decision keeps the formats scoring at least SELECT_SCORE; otherwise every
+# format with a nonzero score is a candidate.
+SELECT_SCORE = 2
+CONFIDENT_MARGIN = 3
+DEFAULT_MIN_CONFIDENCE = 1.0
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def score_skills(prompt: str) -> Dict[str, int]:
+    """Return the keyword score of each skill for a prompt."""
+    words = set(_WORD.findall(prompt.lower()))
+    return {
+        skill: sum(weight for keyword, weight in keywords.items() if keyword in words)
+        for skill, keywords in SKILL_KEYWORDS.items()
+    }
+
+
+def _ask_model(client: Anthropic, model: str, prompt: str) -> Optional[List[str]]:
+    """Ask a small model which formats a request needs; None if unclear."""
+    response = client.messages.create(
+        model=model,
+        max_tokens=20,
+        messages=[{
+            "role": "user",
+            "content": (
+                "Which document formats does this request need? Answer only with a "
+                f"comma-separated list from: {', '.join(ALL_SKILLS)}, or 'unsure'.\n\n"
+                f"Request: {prompt}"
+            )
+        }]
+    )
+    text = "".join(block.text for block in response.content if block.type == "text").lower()
+    skills = [skill for skill in ALL_SKILLS if re.search(rf"\b{skill}\b", text)]
+    return skills or None
+
+
+def route_skills(
+    prompt: str,
+    client: Optional[Anthropic] = None,
+    model: Optional[str] = ROUTER_MODEL,
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    log_path: Optional[str] = ROUTER_LOG
+) -> Dict[str, Any]:
+    """
+    Choose the document skills to attach for a prompt.
+
+    Args:
+        prompt: The user's request
+        client: Anthropic client for the model fallback (default: the shared client)
+        model: Small model asked when keywords are inconclusive (None: no model call)
+        min_confidence: Keyword confidence below which the keywords alone
+            do not decide
+        log_path: Optional JSONL file each decision is appended to
+
+    Returns:
+        Dict with keys: skills, method ('keywords', 'model' or 'all'),
+        confidence, scores, elapsed (seconds)
+    """
+    started = time.perf_counter()
+    scores = score_skills(prompt)
+    top, runner_up = sorted(scores.values(), reverse=True)[:2]
+    confidence = min(1.0, (top - runner_up) / CONFIDENT_MARGIN)
+    skills = [skill for skill in ALL_SKILLS if scores[skill] >= SELECT_SCORE]
+    method = "keywords"
+
+    if not skills or confidence < min_confidence:
+        # A close call: keep every format the prompt mentions at all
+        skills = [skill for skill in ALL_SKILLS if scores[skill] > 0]
+        if not skills:
+            skills, method = list(ALL_SKILLS), "all"
+        if model:
+            try:
+                chosen = _ask_model(client or get_client(), model, prompt)
+                if chosen:
+                    skills, method = chosen, "model"
+            except Exception as e:
+                print(f"Warning: Skill router model fallback failed: {e}")
+
+    decision = {
+        'skills': skills,
+        'method': method,
+        'confidence': confidence,
+        'scores': scores,
+        'elapsed': time.perf_counter() - started
+    }
+
+    print(f"🧭 Skill router: {', '.join(skills)} ({method}, confidence {confidence:.2f})")
+    if log_path:
+        try:
+            with open(log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'time': time.time(), 'prompt': prompt, **decision}) + "\n")
+        except OSError as e:
+            print(f"Warning: Could not write skill router log: {e}")
+
+    return decision
@@ -0,0 +1,182 @@
+"""
+Multi-turn skill sessions that reuse one code-execution container.
+
+Every request that only specifies ``container={"skills": [...]}`` starts a
+fresh container and loads the skills again. SkillSession captures the
+container id from the first response and sends it with each follow-up
+request, so later turns skip the container cold start and can work on the
+files created by earlier turns. The conversation history is kept as well.
+
+A container that has been idle longer than ``idle_timeout`` seconds, or
+that is past the expiry reported by the API, is dropped and the next turn
+starts a new one. close() ends the session.
+
+Example:
+    >>> with SkillSession(client, skills=["xlsx"]) as session:
+    ...     response = session.send("Create a budget spreadsheet")
+    ...     response = session.send("Add a chart of the monthly totals")
+    ...     print(session.container_id, session.turns)
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any
+
+from anthropic import Anthropic
+
+from anthropic_client_init import MODEL, get_client
+from skill_request import CACHE_CONTROL, build_skill_request
+
+# Containers are kept by the API for a limited time after their last use;
+# stay below that so a reused id is still valid
+DEFAULT_IDLE_TIMEOUT = 240
+
+
+class SkillSession:
+    """
+    Conversation with Claude that keeps its code-execution container.
+
+    Args:
+        client: Anthropic client (default: the shared client)
+        skills: Anthropic skill IDs to attach (default: all document skills)
+        model: Model to use (default: ANTHROPIC_MODEL)
+        max_tokens: Maximum tokens to generate per turn
+        idle_timeout: Seconds without a request after which the container
+            is not reused
+        keep_history: Send earlier turns with each request and mark the
+            conversation for prompt caching (default: True). Turn it off
+            for one-off requests, which would only pay for the cache write.
+
+    Each turn is recorded in ``turns`` with the container id, whether the
+    container was reused and the request time in seconds.
+    """
+
+    def __init__(
+        self,
+        client: Optional[Anthropic] = None,
+        skills: Optional[List[str]] = None,
+        model: str = MODEL,
+        max_tokens: int = 4096,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        keep_history: bool = True
+    ):
+        self.client = client or get_client()
+        self.skills = skills
+        self.model = model
+        self.max_tokens = max_tokens
+        self.idle_timeout = idle_timeout
+        self.keep_history = keep_history
+        self.messages: List[Dict[str, Any]] = []
+        self.turns: List[Dict[str, Any]] = []
+        self._container_id: Optional[str] = None
+        self._expires_at: Optional[datetime] = None
+        self._last_used: Optional[float] = None
+        self._pending: Optional[Dict[str, Any]] = None
+        self._closed = False
+
+    @property
+    def container_id(self) -> Optional[str]:
+        """Id of the container the next turn will reuse, if it is still usable."""
+        if self._container_id is None:
+            return None
+        if self._last_used is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self._drop_container(f"idle for more than {self.idle_timeout:.0f} s")
+        elif self._expires_at is not None and datetime.now(timezone.utc) >= self._expires_at:
+            self._drop_container("expired")
+        return self._container_id
+
+    def _drop_container(self, reason: str) -> None:
+        print(f"Warning: Not reusing container {self._container_id} ({reason}); starting a new one")
+        self._container_id = None
+        self._expires_at = None
+
+    def request(self, prompt: str) -> Dict[str, Any]:
+        """
+        Build the arguments for the next turn without sending it.
+
+        Use this with client.beta.messages.stream() or stream_skill_request()
+        and pass the final message to record() afterwards; send() does both
+        for non-streaming requests.
+
+        Raises:
+            RuntimeError: If the session has been closed
+        """
+        if self._closed:
+            raise RuntimeError("SkillSession is closed")
+
+        container_id = self.container_id
+        request = build_skill_request(
+            prompt, self.skills, model=self.model,
+            max_tokens=self.max_tokens, container_id=container_id
+        )
+        user_message = {"role": "user", "content": prompt}
+        if self.keep_history:
+            # History is only kept when follow-up turns are expected, so
+            # caching the conversation so far pays off: the next turn reads
+            # it back. Only the newest message carries the breakpoint.
+            cached_message = {
+                "role": "user",
+                "content": [{"type": "text", "text": prompt, "cache_control": CACHE_CONTROL}]
+            }
+            request['messages'] = self.messages + [cached_message]
+        self._pending = {
+            'message': user_message,
+            'reused': container_id is not None,
+            'started': time.perf_counter()
+        }
+        return request
+
+    def record(self, response) -> None:
+        """Store a turn's response and the container it ran in."""
+        pending = self._pending or {'message': None, 'reused': False, 'started': None}
+        self._pending = None
+
+        container = getattr(response, 'container', None)
+        if container is not None:
+            self._container_id = container.id
+            self._expires_at = container.expires_at
+        self._last_used = time.monotonic()
+
+        if self.keep_history and pending['message'] is not None:
+            self.messages.append(pending['message'])
+            self.messages.append({"role": "assistant", "content": response.content})
+
+        self.turns.append({
+            'container_id': self._container_id,
+            'reused': pending['reused'],
+            'elapsed': time.perf_counter() - pending['started'] if pending['started'] else None
+        })
+
+    def send(self, prompt: str):
+        """
+        Send one turn and return the response.
+
+        Args:
+            prompt: The user's request for this turn
+
+        Returns:
+            The response from client.beta.messages.create()
+        """
+        response = self.client.beta.messages.create(**self.request(prompt))
+        self.record(response)
+        return response
+
+    def close(self) -> None:
+        """
+        End the session.
+
+        The API has no call to delete a container; it is released once it
+        stops being used. Closing forgets its id and the history so the
+        session cannot keep it alive by accident.
+        """
+        self._closed = True
+        self._container_id = None
+        self._expires_at = None
+        self._pending = None
+        self.messages = []
+
+    def __enter__(self) -> "SkillSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,123 @@
+"""
+Streaming skill requests with early file downloads.
+
+stream_skill_request() sends a request through the messages stream API,
+prints Claude's text as it arrives and starts downloading each generated
+file as soon as the tool result block that reports it is received, while
+the rest of the response is still being generated.
+
+Example:
+    >>> response, results = stream_skill_request(
+    ...     client,
+    ...     output_dir="outputs",
+    ...     model=MODEL,
+    ...     max_tokens=4096,
+    ...     container={"skills": [{"type": "anthropic", "skill_id": "xlsx", "version": "latest"}]},
+    ...     tools=[{"type": "code_execution_20250825", "name": "code_execution"}],
+    ...     messages=[{"role": "user", "content": "Create a budget spreadsheet"}],
+    ...     betas=["code-execution-2025-08-25", "files-api-2025-04-14", "skills-2025-10-02"],
+    ... )
+    >>> print_download_summary(results)
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Tuple
+
+from anthropic import Anthropic
+
+from artifact_store import ArtifactStore
+from file_utils import (
+    DEFAULT_MAX_WORKERS,
+    FileIdExtractor,
+    MetadataCache,
+    OutputPaths,
+    _download_indexed_file,
+    get_metadata_cache,
+)
+
+# Content blocks announced with a "🔧 Tool Used" line while streaming
+_TOOL_BLOCK_TYPES = ("tool_use", "server_tool_use")
+
+
+def stream_skill_request(
+    client: Anthropic,
+    output_dir: str = "outputs",
+    prefix: str = "",
+    overwrite: bool = True,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    cache: Optional[MetadataCache] = None,
+    store: Optional[ArtifactStore] = None,
+    echo: bool = True,
+    **request
+) -> Tuple[Any, List[Dict[str, Any]]]:
+    """
+    Stream a skills request and download its files while it is generated.
+
+    Args:
+        client: Anthropic client instance
+        output_dir: Directory where files should be saved
+        prefix: Optional prefix for filenames
+        overwrite: Whether to overwrite existing files (default: True)
+        max_workers: Maximum number of files downloaded in parallel
+        cache: Metadata cache to use (default: the shared module cache)
+        store: Optional ArtifactStore; files already stored are not downloaded
+        echo: Print text and tool use as they stream (default: True)
+        **request: Arguments for client.beta.messages.stream(), the same as
+            for client.beta.messages.create()
+
+    Returns:
+        (final message, download results in order of discovery). Each
+        result also records 'available_after': seconds from the start of
+        the request until the file was reported.
+    """
+    cache = cache if cache is not None else get_metadata_cache()
+    extractor = FileIdExtractor()
+    started = time.perf_counter()
+    discovered = []
+    futures = []
+    paths = OutputPaths()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def start_download(file_id: str) -> None:
+            discovered.append(time.perf_counter() - started)
+            futures.append(executor.submit(
+                _download_indexed_file,
+                client, len(futures) + 1, file_id, output_dir, prefix,
+                overwrite, cache, store, None, paths
+            ))
+
+        with client.beta.messages.stream(**request) as stream:
+            for event in stream:
+                if echo:
+                    _echo_event(event)
+                for file_id in extractor.feed_event(event):
+                    start_download(file_id)
+            response = stream.get_final_message()
+
+        # Pick up anything the events did not carry (e.g. older SDK versions)
+        for file_id in extractor.feed_blocks(response.content):
+            start_download(file_id)
+
+        results = [future.result() for future in futures]
+
+    for result, available_after in zip(results, discovered):
+        result['available_after'] = available_after
+
+    if echo:
+        print()
+
+    return response, results
+
+
+def _echo_event(event) -> None:
+    """Print streamed text deltas and tool use announcements."""
+    if event.type == "content_block_delta" and getattr(event.delta, 'type', None) == "text_delta":
+        sys.stdout.write(event.delta.text)
+        sys.stdout.flush()
+    elif event.type == "content_block_start":
+        block = event.content_block
+        if block.type in _TOOL_BLOCK_TYPES:
+            print(f"\n🔧 Tool Used: {block.name}")
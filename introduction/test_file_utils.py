@@ -0,0 +1,276 @@
+"""
+Offline tests for file_utils. Downloads run against the local
+FakeFilesServer:
+
+    cd introduction
+    python -m pytest -q
+"""
+
+import asyncio
+import io
+import os
+import threading
+import zipfile
+
+from anthropic import Anthropic, AsyncAnthropic
+
+import async_file_utils
+from artifact_store import ArtifactStore
+from fake_files_server import FakeFilesServer
+from json_files import load_json, save_json
+from file_utils import (
+    MetadataCache,
+    download_all_files,
+    download_file,
+    percentile,
+    print_download_summary,
+)
+
+FILE_ID = "file_test"
+CONTENT = os.urandom(200 * 1024)
+
+PDF = b"%PDF-1.7\n" + os.urandom(150 * 1024) + b"\nstartxref\n12345\n%%EOF\n"
+
+
+def _xlsx() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr("xl/workbook.xml", "<workbook/>" + "x" * 100000)
+    return buffer.getvalue()
+
+
+def _download(server, tmp_path, filename="data.bin", **kwargs):
+    client = Anthropic(api_key="test", base_url=server.base_url)
+    output_path = str(tmp_path / filename)
+    result = download_file(client, FILE_ID, output_path, backoff_base=0.01, **kwargs)
+    return result, output_path
+
+
+def _validated(tmp_path, filename, content, **server_options):
+    with FakeFilesServer({FILE_ID: content}, **server_options) as server:
+        result, output_path = _download(server, tmp_path, filename=filename)
+    return result, output_path
+
+
+def _response(client):
+    # The stand-in server reports every file it serves in its messages
+    return client.beta.messages.create(
+        model="test", max_tokens=16, messages=[{"role": "user", "content": "files"}]
+    )
+
+
+def test_retry_resumes_after_error_and_dropped_connection(tmp_path):
+    faults = {FILE_ID: [500, ("truncate", 65536)]}
+    with FakeFilesServer({FILE_ID: CONTENT}, faults=faults) as server:
+        result, output_path = _download(server, tmp_path)
+
+    assert result['success'], result['error']
+    assert result['attempts'] == 3
+    assert result['resumed_bytes'] == 65536
+    assert result['size'] == len(CONTENT)
+    assert server.stats['range'] == 1
+    with open(output_path, 'rb') as f:
+        assert f.read() == CONTENT
+    assert os.listdir(tmp_path) == ["data.bin"]
+
+
+def test_async_download_retries_resumes_and_validates(tmp_path):
+    async def download(filename, content, faults):
+        with FakeFilesServer({FILE_ID: content}, faults={FILE_ID: faults}) as server:
+            client = AsyncAnthropic(api_key="test", base_url=server.base_url)
+            return await async_file_utils.download_file(
+                client, FILE_ID, str(tmp_path / filename), backoff_base=0.01
+            )
+
+    result = asyncio.run(download("report.pdf", PDF, [500, ("truncate", 65536)]))
+    assert result['success'], result['error']
+    assert (result['attempts'], result['resumed_bytes']) == (3, 65536)
+    assert result['validation'] == "valid"
+    with open(tmp_path / "report.pdf", 'rb') as f:
+        assert f.read() == PDF
+
+    result = asyncio.run(download("broken.pdf", PDF[:-200], []))
+    assert not result['success']
+    assert (result['attempts'], result['validation']) == (1, "invalid")
+    assert sorted(os.listdir(tmp_path)) == ["report.pdf"]
+
+
+def test_restarts_when_ranges_are_not_supported(tmp_path):
+    faults = {FILE_ID: [("truncate", 65536)]}
+    with FakeFilesServer({FILE_ID: CONTENT}, faults=faults, support_ranges=False) as server:
+        result, output_path = _download(server, tmp_path)
+
+    assert result['success'], result['error']
+    assert result['attempts'] == 2
+    assert result['resumed_bytes'] == 0
+    with open(output_path, 'rb') as f:
+        assert f.read() == CONTENT
+
+
+def test_persistent_server_error_is_not_retried_by_the_sdk_too(tmp_path):
+    faults = {FILE_ID: [503] * 10}
+    with FakeFilesServer({FILE_ID: CONTENT}, faults=faults) as server:
+        result, _ = _download(server, tmp_path, max_retries=2)
+
+    assert not result['success']
+    assert result['attempts'] == 3
+    assert server.stats['download'] == 3
+
+
+def test_local_errors_are_not_retried(tmp_path):
+    def progress_callback(chunk_bytes, total_bytes):
+        raise RuntimeError("progress display failed")
+
+    with FakeFilesServer({FILE_ID: CONTENT}) as server:
+        result, _ = _download(server, tmp_path, progress_callback=progress_callback)
+
+    assert not result['success']
+    assert result['attempts'] == 1
+    assert "progress display failed" in result['error']
+
+
+def test_files_with_the_same_name_get_distinct_paths(tmp_path):
+    files = {"file_a": b"first", "file_b": b"second", "file_c": b"third"}
+    filenames = {"file_a": "report.txt", "file_b": "report.txt", "file_c": "report.txt"}
+    with FakeFilesServer(files, filenames=filenames, latency=0.01) as server:
+        client = Anthropic(api_key="test", base_url=server.base_url)
+        results = download_all_files(client, _response(client), str(tmp_path), max_workers=4)
+
+    names = [os.path.basename(result['output_path']) for result in results]
+    assert names == ["report.txt", "report (2).txt", "report (3).txt"]
+    for result, content in zip(results, files.values()):
+        assert result['success'] and not result['overwritten']
+        with open(result['output_path'], 'rb') as f:
+            assert f.read() == content
+
+
+def test_store_skips_downloads_on_repeat_runs(tmp_path):
+    files = {"file_a": b"same content", "file_b": b"same content", "file_c": b"other"}
+    for run in range(2):
+        store = ArtifactStore(str(tmp_path / "store"))
+        with FakeFilesServer(files) as server:
+            client = Anthropic(api_key="test", base_url=server.base_url)
+            results = download_all_files(
+                client, _response(client), str(tmp_path / "out"), store=store,
+                cache=MetadataCache()
+            )
+        assert all(result['success'] for result in results)
+        assert [result['from_store'] for result in results] == [run == 1] * 3
+
+    # A fresh process with an empty metadata cache made no requests at all
+    assert server.stats['download'] == 0
+    assert server.stats['metadata'] == server.stats['list'] == 0
+    # Identical content is one blob, hard-linked to both outputs
+    first, second, third = (os.stat(result['output_path']) for result in results)
+    assert (first.st_ino, first.st_dev) == (second.st_ino, second.st_dev)
+    assert first.st_ino != third.st_ino
+    assert results[0]['sha256'] == results[1]['sha256']
+    assert store.verify() == []
+
+
+def test_stored_files_take_the_current_prefix(tmp_path):
+    files = {"file_a": b"budget"}
+    store = ArtifactStore(str(tmp_path / "store"))
+    names = []
+    with FakeFilesServer(files, filenames={"file_a": "report.txt"}) as server:
+        client = Anthropic(api_key="test", base_url=server.base_url)
+        response = _response(client)
+        for prefix in ("budget_", "q3_", ""):
+            results = download_all_files(
+                client, response, str(tmp_path / "out"), prefix=prefix, store=store,
+                cache=MetadataCache()
+            )
+            names.append(os.path.basename(results[0]['output_path']))
+
+    assert names == ["budget_report.txt", "q3_report.txt", "report.txt"]
+    assert server.stats['download'] == 1
+
+
+def test_concurrent_json_saves_do_not_share_a_temporary_file(tmp_path):
+    path = str(tmp_path / "state" / "index.json")
+    errors = []
+
+    def save(writer):
+        try:
+            for i in range(50):
+                save_json(path, {'writer': writer, 'i': i, 'padding': "x" * 10000})
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(writer,)) for writer in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert load_json(path, "index")['i'] == 49
+    assert os.listdir(tmp_path / "state") == ["index.json"]
+
+
+def test_unreadable_json_is_ignored(tmp_path, capsys):
+    path = tmp_path / "cache.json"
+    assert load_json(str(path), "metadata cache") is None
+    path.write_text("{truncated")
+    assert len(MetadataCache(path=str(path))) == 0
+    assert "Warning: Ignoring unreadable metadata cache" in capsys.readouterr().out
+
+
+def test_valid_documents_pass_validation(tmp_path):
+    for filename, content in (("report.pdf", PDF), ("budget.xlsx", _xlsx())):
+        result, output_path = _validated(tmp_path, filename, content)
+        assert result['success'], result['error']
+        assert result['validation'] == "valid"
+        with open(output_path, 'rb') as f:
+            assert f.read() == content
+
+
+def test_resumed_download_is_validated_from_the_partial_file(tmp_path):
+    faults = {FILE_ID: [("truncate", 65536)]}
+    result, _ = _validated(tmp_path, "report.pdf", PDF, faults=faults)
+
+    assert result['success'], result['error']
+    assert result['resumed_bytes'] == 65536
+    assert result['validation'] == "valid"
+
+
+def test_corrupt_documents_fail_without_retry_or_leftovers(tmp_path):
+    xlsx = _xlsx()
+    corrupt = {
+        "truncated.pdf": PDF[:-200],
+        "header.pdf": b"<html>error page</html>" + PDF,
+        "truncated.xlsx": xlsx[:-10],
+        "not-a-zip.xlsx": b"plain text" * 1000,
+        # End record whose central directory offset points past itself
+        "bad-offset.xlsx": xlsx[:-6] + (len(xlsx)).to_bytes(4, "little") + xlsx[-2:],
+    }
+    for filename, content in corrupt.items():
+        result, output_path = _validated(tmp_path, filename, content)
+        assert not result['success'], filename
+        assert result['validation'] == "invalid", filename
+        assert result['attempts'] == 1, filename
+        assert not os.path.exists(output_path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_summary_throughput_spans_overlapping_downloads(capsys):
+    # Four 1 MB downloads of 1 s each, running two at a time: 4 MB in 2 s
+    results = [
+        {'output_path': f"out/{i}.bin", 'success': True, 'size': 1024 * 1024,
+         'resumed_bytes': 0, 'started_at': 100.0 + i // 2, 'wall_time': 1.0, 'ttfb': 0.1}
+        for i in range(4)
+    ]
+    print_download_summary(results)
+
+    assert "Throughput: 2.00 MB/s (4 downloads in 2.00 s, 1.00 MB/s per file)" in capsys.readouterr().out
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([1, 2], 50) == 1
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile(list(range(1, 7)), 50) == 3
+    assert percentile(list(range(1, 11)), 50) == 5
+    assert percentile(list(range(1, 101)), 99) == 99
+    assert percentile([3, 1, 2], 0) == 1
+    assert percentile([3, 1, 2], 100) == 3
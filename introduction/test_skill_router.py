@@ -0,0 +1,34 @@
+"""
+Offline tests for skill_router's keyword decisions:
+
+    cd introduction
+    python -m pytest -q
+"""
+
+from skill_router import route_skills
+
+
+def _route(prompt):
+    return route_skills(prompt, model=None, log_path=None)
+
+
+def test_clear_lead_selects_one_format():
+    decision = _route("Create a quarterly sales spreadsheet")
+    assert decision['skills'] == ["xlsx"]
+    assert (decision['method'], decision['confidence']) == ("keywords", 1.0)
+
+
+def test_close_call_keeps_every_matching_format():
+    decision = _route("Create a document with a table of the budget data")
+    assert decision['skills'] == ["xlsx", "docx"]
+    assert decision['confidence'] < 1.0
+
+    decision = _route("Create an Excel spreadsheet and a PowerPoint deck")
+    assert decision['skills'] == ["xlsx", "pptx"]
+    assert decision['confidence'] == 0.0
+
+
+def test_no_match_attaches_all_skills():
+    decision = _route("Hello there")
+    assert decision['method'] == "all"
+    assert decision['skills'] == ["xlsx", "pptx", "pdf", "docx"]